@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the hand tracking pipeline.
+
+Feeds recorded video files or image directories through the same
+prepare_frame -> GestureRecognizer -> HandFrame -> serialization path as
+hand_tracker.py, as fast as possible, with no camera, window or WebSocket
+clients. Runs headless, so CI boxes can catch performance regressions.
+
+Usage:
+    python benchmark.py clip.mp4 [frames_dir ...] [--json results.json]
+    python benchmark.py clip.mp4 --baseline results.json --max-regression 0.15
+    python benchmark.py clip.mp4 --roi          # cropped inference, as hand_tracker.py --roi
+    python benchmark.py clip.mp4 --backend landmarker
+    python benchmark.py clip.mp4 --compare-backends   # geometric gestures vs GestureRecognizer
+    python benchmark.py clip.mp4 --compare-variant landmarker_int8 --model-registry variants.json
+    python benchmark.py clip.mp4 --model landmarker_f16   # a model variant (see models.py) or bundle path
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+
+import frame_sources
+import hand_tracker
+import wire_format
+from gesture_events import classify
+from hand_frame import HandFrame, OPEN_PALM
+from metrics import LatencyHistogram, PipelineMetrics
+from models import BACKENDS, DEFAULT_VARIANTS, VARIANTS, ModelError, load_registry
+from roi import RoiTracker, remap_to_frame
+
+
+def iter_frames(spec: str):
+    """Yield BGR frames from a frame source spec (video, image directory, ...).
+
+    Synthetic and camera sources do not end; bound them with --max-frames.
+    """
+    source = frame_sources.open_source(spec, realtime=False)
+    try:
+        frame = None
+        while True:
+            # Decode into the same buffer each time; callers use a frame before asking for the next
+            success, frame = source.read(frame)
+            if not success:
+                return
+            yield frame
+    finally:
+        source.release()
+
+
+def current_rss_mb() -> float:
+    """Resident set size in MB (Linux /proc), falling back to peak RSS; 0 where neither exists (Windows)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def run_benchmark(paths: list, model_path: str, warmup: int, max_frames: int,
+                  roi: RoiTracker = None, backend: str = "gesture_recognizer") -> dict:
+    """Run every frame of every input through the pipeline and summarize."""
+    recognizer = hand_tracker.create_recognizer(model_path=model_path, model_backend=backend)
+    stats = PipelineMetrics(window=100_000)
+    frames = 0
+    hands_seen = 0
+    busy = 0.0  # Pipeline time only, excluding video decode
+
+    try:
+        start_wall = start_cpu = None
+        for path in paths:
+            if max_frames and frames >= max_frames:
+                break
+            for frame in iter_frames(path):
+                if max_frames and frames >= max_frames:
+                    break
+
+                t0 = time.perf_counter()
+                _, mp_image, region = hand_tracker.prepare_frame(frame, roi)
+                t1 = time.perf_counter()
+                result = recognizer.recognize(mp_image)
+                t2 = time.perf_counter()
+                hand_frame = HandFrame.from_result(result, not hand_tracker.capture_buffers.skip_flip)
+                hand_frame.timestamp = frames
+                if roi:
+                    remap_to_frame(hand_frame, region)
+                    roi.update(hand_frame)
+                json.dumps(hand_frame.to_payload())
+                wire_format.encode_frame(hand_frame)
+                wire_format.encode_frame(hand_frame, quantize=True)
+                t3 = time.perf_counter()
+
+                frames += 1
+                if frames <= warmup:
+                    continue
+                if start_wall is None:
+                    start_wall, start_cpu = t0, time.process_time()
+
+                stats.record("convert", t1 - t0)
+                stats.record("inference", t2 - t1)
+                stats.record("serialize", t3 - t2)
+                stats.record("total", t3 - t0)
+                stats.frame_done(t3)
+                busy += t3 - t0
+                hands_seen += hand_frame.num_hands
+    finally:
+        recognizer.close()
+
+    measured = max(frames - warmup, 0)
+    if not measured:
+        raise RuntimeError("No frames measured; add inputs or lower --warmup")
+
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    stages = {stage: stats.stages[stage].summary() for stage in ("convert", "inference", "serialize", "total")}
+    return {
+        "inputs": paths,
+        "frames": measured,
+        "fps": round(measured / busy, 2),
+        "wall_fps": round(measured / wall, 2),
+        "cpu_percent": round(100.0 * cpu / wall, 1),
+        "rss_mb": round(current_rss_mb(), 1),
+        "avg_hands": round(hands_seen / measured, 3),
+        "roi": bool(roi),
+        "backend": backend,
+        "stages": stages
+    }
+
+
+def compare_backends(paths: list, warmup: int, max_frames: int,
+                     candidate: str = DEFAULT_VARIANTS["landmarker"]) -> dict:
+    """Run a model variant and the reference GestureRecognizer on the same frames.
+
+    candidate defaults to the geometric gesture backend. Its interaction
+    agreement is the accuracy score models.py's registry expects for it.
+
+    Latency is the recognize() call including gesture classification.
+    Gesture agreement counts hands both backends detected on the same side;
+    interaction agreement compares what gesture_events.classify() makes of
+    each frame (CATCH / PASS / NONE), which is what the game acts on.
+    """
+    reference = DEFAULT_VARIANTS["gesture_recognizer"]
+    recognizers = {
+        name: hand_tracker.create_recognizer(model_path=hand_tracker.model_cache.path(VARIANTS[name]),
+                                             model_backend=VARIANTS[name].backend)
+        for name in (reference, candidate)
+    }
+    latency = {name: LatencyHistogram(100_000) for name in recognizers}
+    mirrored = not hand_tracker.capture_buffers.skip_flip
+    frames = 0
+    counts = collections.Counter()
+    interactions = collections.Counter()
+
+    try:
+        for path in paths:
+            for frame in iter_frames(path):
+                if max_frames and frames >= max_frames:
+                    break
+                frames += 1
+                _, mp_image, _ = hand_tracker.prepare_frame(frame)
+                hand_frames = {}
+                for name, recognizer in recognizers.items():
+                    started = time.perf_counter()
+                    result = recognizer.recognize(mp_image)
+                    if frames > warmup:
+                        latency[name].record(time.perf_counter() - started)
+                    hand_frames[name] = HandFrame.from_result(result, mirrored)
+                if frames <= warmup:
+                    continue
+
+                ref, test = hand_frames[reference], hand_frames[candidate]
+                both = ref.present & test.present
+                counts["frames"] += 1
+                counts["presence_match"] += bool((ref.present == test.present).all())
+                counts["hands"] += int(both.sum())
+                counts["gesture_match"] += int((ref.gestures[both] == test.gestures[both]).sum())
+                counts["open_palm_match"] += int(((ref.gestures[both] == OPEN_PALM)
+                                                  == (test.gestures[both] == OPEN_PALM)).sum())
+                counts["two_open_palms_match"] += ref.two_open_palms == test.two_open_palms
+                interactions[(classify(ref, "PASS"), classify(test, "PASS"))] += 1
+    finally:
+        for recognizer in recognizers.values():
+            recognizer.close()
+
+    if not counts["frames"]:
+        raise RuntimeError("No frames compared; add inputs or lower --warmup")
+
+    def rate(key: str, total: str) -> float:
+        return round(counts[key] / counts[total], 4) if counts[total] else 0.0
+
+    return {
+        "inputs": paths,
+        "frames": counts["frames"],
+        "hands_compared": counts["hands"],
+        "latency": {name: histogram.summary() for name, histogram in latency.items()},
+        "presence_agreement": rate("presence_match", "frames"),
+        "gesture_agreement": rate("gesture_match", "hands"),
+        "open_palm_agreement": rate("open_palm_match", "hands"),
+        "two_open_palms_agreement": rate("two_open_palms_match", "frames"),
+        "interaction_agreement": round(
+            sum(n for (ref, test), n in interactions.items() if ref == test) / counts["frames"], 4
+        ),
+        "interactions": {f"{ref}->{test}": n for (ref, test), n in sorted(interactions.items())}
+    }
+
+
+def print_comparison(results: dict):
+    print(f"Frames: {results['frames']}  Hands compared: {results['hands_compared']}")
+    print(f"{'variant':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, summary in results["latency"].items():
+        print(f"{name:<26}{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+              f"{summary['p99_ms']:>10.2f}{summary['mean_ms']:>10.2f}")
+    for key in ("presence", "gesture", "open_palm", "two_open_palms", "interaction"):
+        print(f"{key.replace('_', ' ')} agreement: {results[key + '_agreement']:.1%}")
+    print("Interactions (reference->candidate): "
+          + ", ".join(f"{pair} {n}" for pair, n in results["interactions"].items()))
+
+
+def print_report(results: dict):
+    print(f"Frames: {results['frames']}  FPS: {results['fps']} ({results['wall_fps']} incl. decode)  "
+          f"CPU: {results['cpu_percent']}%  RSS: {results['rss_mb']} MB  "
+          f"Avg hands: {results['avg_hands']}")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, summary in results["stages"].items():
+        print(f"{stage:<12}{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+              f"{summary['p99_ms']:>10.2f}{summary['max_ms']:>10.2f}")
+
+
+def find_regressions(results: dict, baseline: dict, max_regression: float) -> list:
+    """Compare throughput and tail latency against a previous run."""
+    problems = []
+    if results["fps"] < baseline["fps"] * (1.0 - max_regression):
+        problems.append(f"fps {results['fps']} < baseline {baseline['fps']}")
+    for stage, summary in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous and summary["p95_ms"] > previous["p95_ms"] * (1.0 + max_regression):
+            problems.append(f"{stage} p95 {summary['p95_ms']} ms > baseline {previous['p95_ms']} ms")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline hand tracking pipeline benchmark")
+    parser.add_argument("inputs", nargs="+",
+                        help="Video files, image directories or other frame source specs (see frame_sources.py)")
+    parser.add_argument("--backend", choices=BACKENDS, default="gesture_recognizer",
+                        help="Recognizer backend to benchmark, as hand_tracker.py --backend")
+    parser.add_argument("--model", help="Model variant (sets the backend) or bundle path to benchmark "
+                                        "(default: the backend's model)")
+    parser.add_argument("--compare-backends", action="store_true",
+                        help="Compare latency and gesture agreement of both backends instead")
+    parser.add_argument("--compare-variant", metavar="VARIANT",
+                        help="Compare this model variant with the reference GestureRecognizer instead")
+    parser.add_argument("--model-dir", default=hand_tracker.model_cache.directory,
+                        help="Model cache directory, as hand_tracker.py --model-dir")
+    parser.add_argument("--model-registry", metavar="FILE", help="More model variants, as hand_tracker.py")
+    parser.add_argument("--warmup", type=int, default=10, help="Frames excluded from stats (default: 10)")
+    parser.add_argument("--max-frames", type=int, default=0, help="Stop after this many frames (default: all)")
+    parser.add_argument("--roi", action="store_true", help="Benchmark ROI-cropped inference")
+    parser.add_argument("--skip-flip", action="store_true",
+                        help="Benchmark inference on unmirrored frames, as hand_tracker.py --skip-flip")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Previous --json results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Allowed fractional slowdown vs baseline (default: 0.15)")
+
+    args = parser.parse_args()
+
+    hand_tracker.model_cache = hand_tracker.ModelCache(args.model_dir)
+    model_path = args.model
+    try:
+        if args.model_registry:
+            load_registry(args.model_registry)
+        candidate = args.compare_variant or (DEFAULT_VARIANTS["landmarker"] if args.compare_backends else None)
+        if candidate:
+            if candidate not in VARIANTS:
+                raise ModelError(f"Unknown variant {candidate}")
+            needed = [DEFAULT_VARIANTS["gesture_recognizer"], candidate]
+        elif args.model in VARIANTS:
+            needed = [args.model]
+            args.backend = VARIANTS[args.model].backend
+        else:
+            needed = [] if args.model else [DEFAULT_VARIANTS[args.backend]]
+        paths = [hand_tracker.model_cache.fetch(VARIANTS[name]) for name in needed]
+        if args.model in VARIANTS:
+            model_path = paths[0]
+    except (OSError, ValueError, TypeError, ModelError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    hand_tracker.capture_buffers = hand_tracker.CaptureBuffers(args.skip_flip)
+    if candidate:
+        results = compare_backends(args.inputs, args.warmup, args.max_frames, candidate)
+        print_comparison(results)
+    else:
+        results = run_benchmark(args.inputs, model_path, args.warmup, args.max_frames,
+                                RoiTracker() if args.roi else None, args.backend)
+        print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline and not candidate:
+        with open(args.baseline) as f:
+            problems = find_regressions(results, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
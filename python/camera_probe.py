@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Camera capability probe: find the capture mode with the freshest frames.
+
+Asking a camera for 640x480 at 30 fps does not say what it delivers: the
+driver may settle on YUYV at a lower rate, or queue several frames so that
+the one read is already old. This opens the camera in every combination of
+capture backend (V4L2, GStreamer, ... as built into OpenCV), pixel format
+(MJPG, YUYV), driver buffer size and resolution, and measures for each:
+
+    fps          frames actually delivered per second
+    age          how old a frame is when read() returns it, from the
+                 driver's buffer timestamp (V4L2; None where unavailable)
+    stale        frames the driver had queued while the reader paused,
+                 which a reader that falls behind gets before a fresh one
+    cpu          CPU time per frame spent in read(), mostly MJPG decoding
+
+The mode picked for the requested resolution is the one reaching the
+requested fps with the lowest worst-case frame age (age plus the stale
+frames' worth of frame intervals). It is written to a profile that
+hand_tracker.py loads at startup (see frame_sources.camera_settings()).
+
+Usage:
+    python camera_probe.py --camera 0 [--width 640 --height 480 --fps 30] [--output camera_profile.json]
+    python hand_tracker.py --probe-camera      # the same, with hand_tracker's camera options
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Optional
+
+import cv2
+
+from frame_sources import camera_backends, open_camera
+
+PROBE_BACKENDS = ["V4L2", "GSTREAMER", "DSHOW", "MSMF", "AVFOUNDATION"]
+FOURCCS = ["MJPG", "YUYV"]
+BUFFER_SIZES = [1, 2, 4]
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+DEFAULT_PROFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "camera_profile.json")
+
+
+def fourcc_name(value: float) -> str:
+    code = int(value)
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0") or "?"
+
+
+def measure_mode(cap: cv2.VideoCapture, seconds: float = 2.0, warmup: float = 0.5, pause: float = 0.5) -> dict:
+    """Read from an open camera for seconds and summarize what it delivered."""
+    deadline = time.monotonic() + warmup
+    while time.monotonic() < deadline:  # Cameras start slowly and adjust exposure first
+        if not cap.read()[0]:
+            break
+
+    frames = 0
+    ages = []
+    cpu_started = time.process_time()
+    started = time.monotonic()
+    while time.monotonic() - started < seconds:
+        success, _ = cap.read()
+        now = time.monotonic()
+        if not success:
+            break
+        frames += 1
+        # V4L2 reports the buffer timestamp on the monotonic clock
+        stamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if stamp > 0 and 0 <= now * 1000 - stamp < 5000:
+            ages.append(now * 1000 - stamp)
+    elapsed = time.monotonic() - started
+    cpu = time.process_time() - cpu_started
+    if not frames:
+        return {"fps": 0.0}
+
+    # Frames the driver queued while nobody read come back at once
+    interval = elapsed / frames
+    time.sleep(pause)
+    stale = 0
+    for _ in range(8):
+        read_started = time.monotonic()
+        if not cap.read()[0] or time.monotonic() - read_started > 0.3 * interval:
+            break
+        stale += 1
+
+    age_ms = statistics.median(ages) if ages else None
+    return {
+        "fps": round(frames / elapsed, 2),
+        "age_ms": round(age_ms, 2) if age_ms is not None else None,
+        "age_p95_ms": round(statistics.quantiles(ages, n=20)[-1], 2) if len(ages) >= 2 else None,
+        "stale_frames": stale,
+        "cpu_ms_per_frame": round(1000 * cpu / frames, 2),
+        # Unknown age: assume half a frame interval, the average wait for a fresh frame
+        "worst_age_ms": round((age_ms if age_ms is not None else 500 * interval) + 1000 * interval * stale, 2)
+    }
+
+
+def probe_camera(index: int, backends: Optional[list] = None, fourccs: list = FOURCCS,
+                 buffer_sizes: list = BUFFER_SIZES, resolutions: list = RESOLUTIONS, fps: float = 30,
+                 seconds: float = 2.0) -> list:
+    """Measure every combination of capture settings; one result dict per mode."""
+    available = camera_backends()
+    backends = [backend for backend in backends or PROBE_BACKENDS if backend in available]
+    results = []
+    for backend, fourcc, buffer_size, (width, height) in itertools.product(backends, fourccs, buffer_sizes,
+                                                                           resolutions):
+        settings = {"backend": backend, "fourcc": fourcc, "buffer_size": buffer_size}
+        print(f"{backend} {fourcc} {width}x{height} buffer {buffer_size}...", end=" ", flush=True)
+        cap = open_camera(index, width, height, fps, **settings)
+        try:
+            if not cap.isOpened():
+                print("cannot open")
+                continue
+            result = {
+                **settings,
+                "requested": f"{width}x{height}",
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "delivered_fourcc": fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+                "reported_fps": cap.get(cv2.CAP_PROP_FPS),
+                **measure_mode(cap, seconds)
+            }
+        finally:
+            cap.release()
+        print(f"{result['width']}x{result['height']} {result['delivered_fourcc']} {result['fps']} fps")
+        results.append(result)
+    return results
+
+
+def pick_mode(results: list, width: int, height: int, fps: float) -> Optional[dict]:
+    """The lowest worst-case age mode at the requested size reaching (nearly) fps.
+
+    Falls back to the fastest modes when none reaches fps, and to any size
+    when the camera cannot deliver the requested one.
+    """
+    usable = [result for result in results if result["fps"] > 0]
+    sized = [result for result in usable if (result["width"], result["height"]) == (width, height)] or usable
+    if not sized:
+        return None
+    fast = [result for result in sized if result["fps"] >= 0.9 * fps]
+    if not fast:
+        best_fps = max(result["fps"] for result in sized)
+        fast = [result for result in sized if result["fps"] >= 0.9 * best_fps]
+    return min(fast, key=lambda result: (result["worst_age_ms"], result["cpu_ms_per_frame"]))
+
+
+def write_profile(path: str, index: int, width: int, height: int, fps: float, results: list) -> Optional[dict]:
+    """Save the probe results and the picked mode; returns the profile, None if nothing worked."""
+    selected = pick_mode(results, width, height, fps)
+    if selected is None:
+        return None
+    profile = {
+        "camera": index,
+        "requested": {"width": width, "height": height, "fps": fps},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "selected": {key: selected[key] for key in ("backend", "fourcc", "buffer_size")},
+        "selected_mode": selected,
+        "modes": results
+    }
+    if (selected["width"], selected["height"]) != (width, height):
+        # Only delivered at another size: the profile applies when that size is asked for
+        profile["requested"].update(width=selected["width"], height=selected["height"])
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    return profile
+
+
+def load_profile(path: str) -> Optional[dict]:
+    """A profile written by write_profile(), or None if there is none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def print_report(results: list, selected: Optional[dict] = None):
+    print(f"\n{'backend':<11}{'fourcc':<8}{'buf':>4}{'requested':>11}{'delivered':>15}{'fps':>8}"
+          f"{'age ms':>9}{'age p95':>9}{'stale':>7}{'cpu ms':>8}{'worst ms':>10}")
+    for result in results:
+        def ms(key):
+            return f"{result[key]:.1f}" if result.get(key) is not None else "-"
+        mark = " *" if result is selected else ""
+        delivered = f"{result['width']}x{result['height']} {result['delivered_fourcc']}"
+        print(f"{result['backend']:<11}{result['fourcc']:<8}{result['buffer_size']:>4}{result['requested']:>11}"
+              f"{delivered:>15}{result['fps']:>8.1f}{ms('age_ms'):>9}{ms('age_p95_ms'):>9}"
+              f"{result.get('stale_frames', '-'):>7}{ms('cpu_ms_per_frame'):>8}{ms('worst_age_ms'):>10}{mark}")
+
+
+def run_probe(index: int, width: int, height: int, fps: float, path: str = DEFAULT_PROFILE,
+              seconds: float = 2.0, backends: Optional[list] = None) -> bool:
+    """Probe a camera, print the results and write the profile; False if no mode worked."""
+    resolutions = RESOLUTIONS if (width, height) in RESOLUTIONS else RESOLUTIONS + [(width, height)]
+    results = probe_camera(index, backends, resolutions=resolutions, fps=fps, seconds=seconds)
+    profile = write_profile(path, index, width, height, fps, results)
+    if profile is None:
+        print(f"No capture mode of camera {index} delivered frames; no profile written")
+        return False
+    print_report(results, profile["selected_mode"])
+    print(f"\nSelected {profile['selected']} for camera {index} at "
+          f"{profile['requested']['width']}x{profile['requested']['height']}@{fps:g}; profile written to {path}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure camera capture modes and write a camera profile")
+    parser.add_argument("--camera", type=int, default=0, help="Camera index (default: 0)")
+    parser.add_argument("--width", type=int, default=640, help="Frame width to pick a mode for (default: 640)")
+    parser.add_argument("--height", type=int, default=480, help="Frame height to pick a mode for (default: 480)")
+    parser.add_argument("--fps", type=float, default=30, help="Frame rate to request (default: 30)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Measured seconds per mode (default: 2)")
+    parser.add_argument("--backends", nargs="+", help=f"Capture backends to try (default: those of "
+                                                       f"{' '.join(PROBE_BACKENDS)} in this OpenCV build)")
+    parser.add_argument("--output", default=DEFAULT_PROFILE, help=f"Profile to write (default: {DEFAULT_PROFILE})")
+
+    args = parser.parse_args()
+
+    if not run_probe(args.camera, args.width, args.height, args.fps, args.output, args.seconds, args.backends):
+        sys.exit(1)
@@ -0,0 +1,320 @@
+"""
+Frame sources for the capture pipeline: webcam, video files, image
+directories and synthetic patterns.
+
+Every source has the cv2.VideoCapture calls the pipeline uses, read(image)
+and release(), so FrameGrabber and the benchmark can take any of them.
+Non-camera sources are paced either in real time (at the source's fps, like
+a camera would deliver them) or as fast as possible (realtime=False), where
+the consumer is expected to take every frame (see FrameGrabber lossless).
+
+Sources are picked with a spec string, see open_source():
+    camera:0  |  video:clip.mp4  |  video:video_generation/*.MOV
+    images:frames_dir  |  synthetic:noise  (blank, noise, bars)
+
+Cameras open with the capture backend, pixel format and driver buffer size
+of a camera profile when one was written for them (see camera_probe.py).
+"""
+
+import glob
+import os
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+SYNTHETIC_PATTERNS = ["blank", "noise", "bars"]
+
+
+class FrameSource:
+    """Base class: read(image) -> (success, BGR frame), like cv2.VideoCapture.
+
+    A source that has run out of frames returns (False, None) and sets
+    finished; with loop=True it starts over instead.
+    """
+
+    name = "source"
+
+    def __init__(self, fps: float, realtime: bool = True, loop: bool = False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.finished = False
+        self.frames_read = 0
+        self._next_due: Optional[float] = None
+
+    @property
+    def frame_size(self) -> tuple:
+        """(width, height) of the frames this source delivers."""
+        raise NotImplementedError
+
+    def read(self, image: Optional[np.ndarray] = None):
+        success, frame = self._read(image)
+        if not success and self.loop and self.frames_read:
+            self.rewind()
+            success, frame = self._read(image)
+        if not success:
+            self.finished = True
+            return False, None
+
+        self.frames_read += 1
+        self._pace()
+        return True, frame
+
+    def _read(self, image):
+        raise NotImplementedError
+
+    def rewind(self):
+        pass
+
+    def _pace(self):
+        """In real-time mode, hold each frame until it is due at fps."""
+        if not self.realtime or self.fps <= 0:
+            return
+        now = time.monotonic()
+        if self._next_due is None or now - self._next_due > 1.0 / self.fps:
+            self._next_due = now  # First frame, or fell behind: don't burst to catch up
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due += 1.0 / self.fps
+
+    def release(self):
+        pass
+
+    def __str__(self) -> str:
+        width, height = self.frame_size
+        pacing = f"{self.fps:g} fps" if self.realtime else "as fast as possible"
+        return f"{self.name} ({width}x{height}, {pacing})"
+
+
+def camera_backends() -> dict:
+    """Name -> OpenCV API id of the camera backends in this OpenCV build."""
+    return {cv2.videoio_registry.getBackendName(api): api for api in cv2.videoio_registry.getCameraBackends()}
+
+
+def open_camera(index: int, width: int = 640, height: int = 480, fps: float = 30, backend: Optional[str] = None,
+                fourcc: Optional[str] = None, buffer_size: Optional[int] = None) -> cv2.VideoCapture:
+    """Open a camera and request a capture mode; the driver may settle on another.
+
+    backend is an OpenCV backend name such as "V4L2" (default: OpenCV's
+    choice), fourcc a pixel format such as "MJPG" or "YUYV", buffer_size the
+    number of frames the driver may queue.
+    """
+    cap = cv2.VideoCapture(index, camera_backends()[backend] if backend else cv2.CAP_ANY)
+    if cap.isOpened():
+        if fourcc:
+            # Before the size: drivers offer different sizes per format
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+def camera_settings(profile: Optional[dict], index: int, width: int, height: int, fps: float) -> dict:
+    """open_camera() settings a camera profile picked for this camera and mode, else {}."""
+    if not profile or profile.get("camera") != index:
+        return {}
+    if profile.get("requested") != {"width": width, "height": height, "fps": fps}:
+        return {}
+    return profile.get("selected") or {}
+
+
+class CameraSource(FrameSource):
+    """A webcam; the driver paces it, so it is always real time."""
+
+    def __init__(self, index: int, width: int = 640, height: int = 480, fps: float = 30, **settings):
+        super().__init__(fps, realtime=True)
+        self.name = f"camera {index}"
+        self.settings = settings
+        if settings:
+            self.name += " [" + " ".join(f"{key} {value}" for key, value in settings.items() if value) + "]"
+        self._cap = open_camera(index, width, height, fps, **settings)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    @property
+    def frame_size(self) -> tuple:
+        return int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self, image: Optional[np.ndarray] = None):
+        # The driver blocks until the next frame: no pacing, never finished
+        success, frame = self._cap.read(image)
+        if success:
+            self.frames_read += 1
+        return success, frame
+
+    def release(self):
+        self._cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """One or more video files played back to back, at their own frame rate.
+
+    Files that cannot be opened are skipped; the source ends when none of
+    the remaining ones can.
+    """
+
+    def __init__(self, paths: list, realtime: bool = True, loop: bool = False):
+        if not paths:
+            raise ValueError("No video files to play")
+        self.paths = paths
+        self._index = -1
+        self._cap = None
+        self._size = (0, 0)
+        if not self._open_next():
+            raise RuntimeError(f"Could not open {paths[0]}" if len(paths) == 1 else
+                               f"Could not open any of the {len(paths)} videos")
+        super().__init__(self._cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime, loop)
+        self.name = paths[0] if len(paths) == 1 else f"{len(paths)} videos"
+
+    def _open_next(self) -> bool:
+        """Move on to the next file of the playlist that opens; False past the last."""
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        while self._index + 1 < len(self.paths):
+            self._index += 1
+            path = self.paths[self._index]
+            cap = cv2.VideoCapture(path)
+            if cap.isOpened():
+                self._cap = cap
+                self._size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                return True
+            cap.release()
+            print(f"Skipping {path}: could not open it")
+        return False
+
+    @property
+    def frame_size(self) -> tuple:
+        return self._size
+
+    def _read(self, image):
+        while self._cap is not None:
+            success, frame = self._cap.read(image)
+            if success:
+                return success, frame
+            self._open_next()
+        return False, None
+
+    def rewind(self):
+        self._index = -1
+        self._open_next()
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """The images of a directory in name order, as frames at a fixed fps."""
+
+    def __init__(self, path: str, fps: float = 30, realtime: bool = True, loop: bool = False):
+        super().__init__(fps, realtime, loop)
+        self.name = path
+        self.paths = [
+            os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        if not self.paths:
+            raise ValueError(f"No images in {path}")
+        self._index = 0
+        self._size = None
+
+    @property
+    def frame_size(self) -> tuple:
+        if self._size is None:
+            height, width = cv2.imread(self.paths[0]).shape[:2]
+            self._size = (width, height)
+        return self._size
+
+    def _read(self, image):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def rewind(self):
+        self._index = 0
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated frames, for load tests without any media.
+
+    blank: black frames; noise: seeded random noise; bars: vertical bars
+    scrolling sideways. Frames are generated once and cycled, so reading
+    costs one copy. count > 0 ends the source after that many frames.
+    """
+
+    def __init__(self, pattern: str = "noise", width: int = 640, height: int = 480, fps: float = 30,
+                 realtime: bool = True, count: int = 0):
+        if pattern not in SYNTHETIC_PATTERNS:
+            raise ValueError(f"Unknown synthetic pattern {pattern!r}, expected one of {SYNTHETIC_PATTERNS}")
+        super().__init__(fps, realtime)
+        self.name = f"synthetic {pattern}"
+        self.count = count
+        self._size = (width, height)
+        self._frames = self._generate(pattern, width, height)
+
+    @staticmethod
+    def _generate(pattern: str, width: int, height: int) -> list:
+        if pattern == "blank":
+            return [np.zeros((height, width, 3), dtype=np.uint8)]
+        if pattern == "noise":
+            rng = np.random.default_rng(0)
+            return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+
+        period = 64
+        columns = (np.arange(width) % period < period // 2).astype(np.uint8) * 255
+        row = np.stack([columns, np.roll(columns, period // 4), np.roll(columns, period // 2)], axis=-1)
+        return [np.broadcast_to(np.roll(row, shift * 4, axis=0), (height, width, 3)).copy()
+                for shift in range(period // 4)]
+
+    @property
+    def frame_size(self) -> tuple:
+        return self._size
+
+    def _read(self, image):
+        if self.count and self.frames_read >= self.count:
+            return False, None
+        frame = self._frames[self.frames_read % len(self._frames)]
+        if image is None or image.shape != frame.shape:
+            image = np.empty_like(frame)
+        np.copyto(image, frame)
+        return True, image
+
+
+def open_source(spec: str, realtime: bool = True, loop: bool = False,
+                width: int = 640, height: int = 480, fps: float = 30,
+                camera_profile: Optional[dict] = None) -> FrameSource:
+    """Build a FrameSource from a spec string (see module docstring).
+
+    Without a "kind:" prefix, a number is a camera index, a directory is an
+    image directory and anything else a video file or glob pattern.
+    width/height/fps apply to cameras and synthetic sources; fps also paces
+    image directories. A camera_profile (see camera_probe.py) applies to
+    the camera and mode it was probed for.
+    """
+    kind, _, target = spec.partition(":")
+    if not target or kind not in ("camera", "video", "images", "synthetic"):
+        kind, target = "", spec
+
+    if kind == "camera" or (not kind and target.isdigit()):
+        index = int(target)
+        return CameraSource(index, width, height, fps, **camera_settings(camera_profile, index, width, height, fps))
+    if kind == "synthetic" or (not kind and target == "synthetic"):
+        return SyntheticSource(target if kind else "noise", width, height, fps, realtime)
+    if kind == "images" or (not kind and os.path.isdir(target)):
+        return ImageDirSource(target, fps, realtime, loop)
+
+    paths = sorted(glob.glob(target)) if glob.has_magic(target) else [target]
+    if not paths:
+        raise ValueError(f"No files match {target}")
+    return VideoFileSource(paths, realtime, loop)
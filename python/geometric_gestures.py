@@ -0,0 +1,141 @@
+"""
+Gesture classification from landmarks alone, for the HandLandmarker backend.
+
+The game only acts on open palms (CATCH, PASS, BALLOON), so the full
+GestureRecognizer classification head is more than it needs. This backend
+runs MediaPipe's HandLandmarker and classifies each hand with a few NumPy
+operations over finger-extension angles: a finger counts as extended when
+its chain of segments is nearly straight and its tip is farther from the
+wrist than its middle joint. The extended-finger bitmask then indexes a
+lookup table of GestureRecognizer category names, so everything downstream
+(HandFrame.from_result, gestures, two_open_palms) is unchanged.
+
+GeometricGestureRecognizer wraps a HandLandmarker in the GestureRecognizer
+call interface (recognize / recognize_for_video / recognize_async).
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from hand_frame import GESTURE_IDS, GESTURE_NAMES, NUM_LANDMARKS
+
+WRIST = 0
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+
+# Landmark chain from base to tip for each finger, thumb first
+FINGER_CHAINS = np.array([
+    [1, 2, 3, 4],
+    [5, 6, 7, 8],
+    [9, 10, 11, 12],
+    [13, 14, 15, 16],
+    [17, 18, 19, 20],
+])
+
+# Most total bend (radians, summed over a finger's two middle joints) that
+# still counts as extended; the thumb bends more even when stretched out
+FINGER_MAX_BEND = 1.0
+THUMB_MAX_BEND = 1.2
+
+
+def _build_gesture_table() -> np.ndarray:
+    """Gesture id for every extended-finger bitmask (bit n = finger n)."""
+    table = np.full(32, GESTURE_IDS["None"], dtype=np.uint8)
+
+    def bits(*fingers) -> int:
+        return sum(1 << finger for finger in fingers)
+
+    four = (INDEX, MIDDLE, RING, PINKY)
+    table[bits(*four)] = table[bits(THUMB, *four)] = GESTURE_IDS["Open_Palm"]
+    table[0] = GESTURE_IDS["Closed_Fist"]
+    table[bits(THUMB)] = GESTURE_IDS["Thumb_Up"]  # Up or down, decided by direction
+    table[bits(INDEX)] = table[bits(THUMB, INDEX)] = GESTURE_IDS["Pointing_Up"]
+    table[bits(INDEX, MIDDLE)] = table[bits(THUMB, INDEX, MIDDLE)] = GESTURE_IDS["Victory"]
+    table[bits(THUMB, INDEX, PINKY)] = GESTURE_IDS["ILoveYou"]
+    return table
+
+
+GESTURE_TABLE = _build_gesture_table()
+
+
+def extended_fingers(landmarks: np.ndarray) -> np.ndarray:
+    """(N, 21, 3) landmarks -> (N, 5) bool, which fingers are extended."""
+    chains = landmarks[:, FINGER_CHAINS]                       # (N, 5, 4, 3)
+    segments = np.diff(chains, axis=2)                         # (N, 5, 3, 3)
+    segments /= np.linalg.norm(segments, axis=-1, keepdims=True) + 1e-9
+    cos = np.sum(segments[:, :, :-1] * segments[:, :, 1:], axis=-1)
+    bend = np.arccos(np.clip(cos, -1.0, 1.0)).sum(axis=-1)    # (N, 5)
+    straight = bend < np.array([THUMB_MAX_BEND] + [FINGER_MAX_BEND] * 4)
+
+    # A finger folded flat at its base can be straight yet point back at the palm
+    wrist = landmarks[:, WRIST, None]
+    tip_reach = np.linalg.norm(chains[:, :, 3] - wrist, axis=-1)
+    joint_reach = np.linalg.norm(chains[:, :, 1] - wrist, axis=-1)
+    return straight & (tip_reach > joint_reach)
+
+
+def classify_gestures(landmarks: np.ndarray) -> np.ndarray:
+    """(N, 21, 3) landmarks -> (N,) ids into hand_frame.GESTURE_NAMES."""
+    if not len(landmarks):
+        return np.zeros(0, dtype=np.uint8)
+    extended = extended_fingers(landmarks)
+    mask = extended @ (1 << np.arange(5))
+    gestures = GESTURE_TABLE[mask]
+
+    # Image y grows downwards: Pointing_Up and Thumb_Up need the tip above its base
+    thumb_down = landmarks[:, 4, 1] > landmarks[:, 2, 1]
+    gestures[(gestures == GESTURE_IDS["Thumb_Up"]) & thumb_down] = GESTURE_IDS["Thumb_Down"]
+    pointing_down = landmarks[:, 8, 1] > landmarks[:, 5, 1]
+    gestures[(gestures == GESTURE_IDS["Pointing_Up"]) & pointing_down] = GESTURE_IDS["None"]
+    return gestures
+
+
+class Category:
+    """The parts of a MediaPipe Category that HandFrame.from_result reads."""
+
+    __slots__ = ("category_name", "score")
+
+    def __init__(self, category_name: str, score: float = 1.0):
+        self.category_name = category_name
+        self.score = score
+
+
+class GeometricResult:
+    """A HandLandmarker result with GestureRecognizer-style gestures added."""
+
+    __slots__ = ("hand_landmarks", "hand_world_landmarks", "handedness", "gestures")
+
+    def __init__(self, result):
+        self.hand_landmarks = result.hand_landmarks
+        self.hand_world_landmarks = result.hand_world_landmarks
+        self.handedness = result.handedness
+        landmarks = np.array(
+            [[(lm.x, lm.y, lm.z) for lm in hand] for hand in result.hand_landmarks], dtype=np.float32
+        ).reshape(-1, NUM_LANDMARKS, 3)
+        self.gestures = [[Category(GESTURE_NAMES[gesture])] for gesture in classify_gestures(landmarks)]
+
+
+def geometric_callback(callback: Callable) -> Callable:
+    """Wrap a LIVE_STREAM result callback to receive GeometricResults."""
+    def on_result(result, output_image, timestamp_ms: int):
+        callback(GeometricResult(result), output_image, timestamp_ms)
+    return on_result
+
+
+class GeometricGestureRecognizer:
+    """A HandLandmarker behind the GestureRecognizer call interface."""
+
+    def __init__(self, landmarker):
+        self._landmarker = landmarker
+
+    def recognize(self, image) -> GeometricResult:
+        return GeometricResult(self._landmarker.detect(image))
+
+    def recognize_for_video(self, image, timestamp_ms: int) -> GeometricResult:
+        return GeometricResult(self._landmarker.detect_for_video(image, timestamp_ms))
+
+    def recognize_async(self, image, timestamp_ms: int):
+        self._landmarker.detect_async(image, timestamp_ms)
+
+    def close(self):
+        self._landmarker.close()
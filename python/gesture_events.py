@@ -0,0 +1,100 @@
+"""
+Server-side gesture debouncing, mirroring scripts/input/gesture_detector.gd.
+
+A GestureEngine turns the per-frame gesture stream into a handful of
+gesture_progress / gesture_detected events, so clients that only care about
+CATCH / PASS / BALLOON do not need every landmark frame. Each client gets its
+own engine because the expected gesture (PASS vs BALLOON) is client context.
+"""
+
+from typing import Optional
+
+from hand_frame import HandFrame, LEFT, OPEN_PALM, RIGHT
+
+# Mirrors Enums.InteractionType in scripts/core/enums.gd
+INTERACTIONS = ["NONE", "CATCH", "PASS", "BALLOON"]
+
+DEFAULT_HOLD_TIME = 0.5  # Seconds, GESTURE_HOLD_TIME in gesture_detector.gd
+
+
+def classify(frame: HandFrame, expected: str) -> str:
+    """Map a frame's gestures to an interaction, as gesture_detector.gd does."""
+    # CATCH: Two open palms
+    if frame.two_open_palms:
+        return "CATCH"
+    # PASS/BALLOON: Any open palm; the expected gesture picks which one
+    if frame.gestures[LEFT] == OPEN_PALM or frame.gestures[RIGHT] == OPEN_PALM:
+        return "BALLOON" if expected == "BALLOON" else "PASS"
+    return "NONE"
+
+
+class GestureEngine:
+    """Hold-to-confirm state machine with release hysteresis.
+
+    A gesture must be held for its hold time to be detected. It only counts as
+    released after it has been absent (or replaced) for release_grace seconds,
+    so a single dropped frame does not restart the hold. Progress events are
+    only sent when progress crosses a progress_step boundary.
+    """
+
+    def __init__(self, hold_times: Optional[dict] = None, release_grace: float = 0.15,
+                 progress_step: float = 0.1, expected: str = "NONE"):
+        self.hold_times = {name: DEFAULT_HOLD_TIME for name in INTERACTIONS[1:]}
+        self.hold_times.update(hold_times or {})
+        self.release_grace = release_grace
+        self.progress_step = progress_step
+        self.expected = expected
+        self.reset()
+
+    def reset(self):
+        self._current = "NONE"
+        self._start_time = 0.0
+        self._last_seen = 0.0
+        self._last_step = -1
+
+    def set_expected(self, expected: str):
+        if expected not in INTERACTIONS:
+            raise ValueError(f"Unknown gesture: {expected}")
+        if expected != self.expected:
+            self.expected = expected
+            self.reset()
+
+    def update(self, frame: HandFrame, now: float) -> list:
+        """Advance with one frame; return the events it produced."""
+        detected = classify(frame, self.expected)
+
+        if detected == "NONE" or detected != self._current:
+            # Hysteresis: keep holding through brief dropouts
+            if self._current != "NONE" and now - self._last_seen < self.release_grace:
+                return []
+            self.reset()
+            if detected == "NONE":
+                return []
+            self._current = detected
+            self._start_time = now
+
+        self._last_seen = now
+        progress = min((now - self._start_time) / self.hold_times[detected], 1.0)
+        events = []
+
+        step = int(progress / self.progress_step)
+        if step != self._last_step:
+            self._last_step = step
+            events.append({"type": "gesture_progress", "gesture": detected, "progress": round(progress, 3)})
+
+        if progress >= 1.0:
+            events.append({"type": "gesture_detected", "gesture": detected, "timestamp": frame.timestamp})
+            self.reset()
+        return events
+
+
+def parse_hold_times(specs: list) -> dict:
+    """Parse GESTURE=SECONDS command line values."""
+    hold_times = {}
+    for spec in specs or []:
+        name, _, seconds = spec.partition("=")
+        name = name.strip().upper()
+        if name not in INTERACTIONS[1:] or not seconds:
+            raise ValueError(f"Expected GESTURE=SECONDS with GESTURE in {INTERACTIONS[1:]}, got {spec!r}")
+        hold_times[name] = float(seconds)
+    return hold_times
@@ -0,0 +1,118 @@
+"""
+Array-backed tracking output for one camera frame.
+
+Each recognizer result is converted once into fixed-size NumPy arrays indexed
+by side (LEFT/RIGHT, after undoing the camera mirroring), and every downstream
+consumer (serialization, recording, drawing, change detection) works from
+those arrays instead of walking MediaPipe's landmark objects again.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+LEFT = 0
+RIGHT = 1
+SIDES = ("left", "right")
+
+# MediaPipe GestureRecognizer categories; unknown names map to "None"
+GESTURE_NAMES = [
+    "None", "Closed_Fist", "Open_Palm", "Pointing_Up",
+    "Thumb_Down", "Thumb_Up", "Victory", "ILoveYou",
+]
+GESTURE_IDS = {name: i for i, name in enumerate(GESTURE_NAMES)}
+OPEN_PALM = GESTURE_IDS["Open_Palm"]
+
+
+class HandFrame:
+    """Landmarks, presence and gestures for up to two hands.
+
+    landmarks: (2, 21, 3) float32 normalized x, y, z; slot LEFT then RIGHT
+    present:   (2,) bool, whether each slot holds a detected hand
+    gestures:  (2,) uint8 ids into GESTURE_NAMES
+    """
+
+    __slots__ = ("landmarks", "present", "gestures", "num_hands", "timestamp", "timings", "predicted")
+
+    def __init__(self, landmarks: Optional[np.ndarray] = None, present: Optional[np.ndarray] = None,
+                 gestures: Optional[np.ndarray] = None, num_hands: int = 0, timestamp: int = 0):
+        self.landmarks = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32) if landmarks is None else landmarks
+        self.present = np.zeros(2, dtype=bool) if present is None else present
+        self.gestures = np.zeros(2, dtype=np.uint8) if gestures is None else gestures
+        self.num_hands = num_hands
+        self.timestamp = timestamp
+        self.timings: Optional[dict] = None  # Per-stage latencies, JSON payload only
+        self.predicted = False  # Extrapolated between inference passes, see prediction.py
+
+    @classmethod
+    def from_result(cls, result, mirrored: bool = True) -> "HandFrame":
+        """Convert a MediaPipe GestureRecognizer result in a single pass.
+
+        mirrored=False means the recognizer saw the unflipped camera image:
+        x is mirrored here instead, so the output matches a flipped input.
+        """
+        frame = cls()
+        if not (result.hand_landmarks and result.handedness):
+            return frame
+
+        # MediaPipe labels handedness as if the image were mirrored
+        right_label = "Left" if mirrored else "Right"
+        frame.num_hands = len(result.hand_landmarks)
+        for i, (hand_landmarks, handedness_info) in enumerate(zip(result.hand_landmarks, result.handedness)):
+            # Flip left/right since camera mirrors
+            side = RIGHT if handedness_info[0].category_name == right_label else LEFT
+            frame.landmarks[side] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks]
+            frame.present[side] = True
+            if result.gestures and i < len(result.gestures) and result.gestures[i]:
+                frame.gestures[side] = GESTURE_IDS.get(result.gestures[i][0].category_name, 0)
+        if not mirrored:
+            frame.landmarks[frame.present, :, 0] = 1.0 - frame.landmarks[frame.present, :, 0]
+        return frame
+
+    @property
+    def two_open_palms(self) -> bool:
+        """CATCH gesture: both hands showing Open_Palm."""
+        return bool(self.gestures[LEFT] == OPEN_PALM and self.gestures[RIGHT] == OPEN_PALM)
+
+    def gesture_name(self, side: int) -> str:
+        gesture_id = int(self.gestures[side])
+        return GESTURE_NAMES[gesture_id] if gesture_id < len(GESTURE_NAMES) else "None"
+
+    def to_payload(self, fields=None) -> dict:
+        """Build the JSON payload shape the Godot client expects.
+
+        fields limits it to some of "gestures", "left_hand" and "right_hand"
+        (see subscriptions.py); fields left out are omitted entirely.
+        """
+        sides = [side for side, name in enumerate(SIDES) if fields is None or f"{name}_hand" in fields]
+        data = {"timestamp": self.timestamp}
+        for side in sides:
+            data[f"{SIDES[side]}_hand"] = {}
+        data["num_hands"] = self.num_hands
+        if fields is None or "gestures" in fields:
+            data["gestures"] = {
+                "left": self.gesture_name(LEFT),
+                "right": self.gesture_name(RIGHT)
+            }
+            data["two_open_palms"] = self.two_open_palms
+
+        # Round in float64 so the JSON gets 4-decimal values, not float32 noise
+        rounded = np.round(self.landmarks.astype(np.float64), 4).tolist() if sides else None
+        for side in sides:
+            if self.present[side]:
+                name = SIDES[side]
+                data[f"{name}_hand"] = {
+                    "handedness": name,
+                    "landmarks": [
+                        {"id": i, "x": x, "y": y, "z": z}
+                        for i, (x, y, z) in enumerate(rounded[side])
+                    ]
+                }
+
+        if self.predicted:
+            data["predicted"] = True
+        if self.timings:
+            data["timings"] = self.timings
+        return data
@@ -5,37 +5,95 @@ MediaPipe Hand Tracking Bridge for Godot
 Captures webcam, processes with MediaPipe Hands, sends landmarks via WebSocket.
 Run this script before starting the Godot game.
 
+Clients receive JSON by default, or the compact binary format from
+wire_format.py by requesting its WebSocket subprotocol. A "subscribe" message
+narrows a client's stream to some fields, a maximum rate or another encoding
+(see subscriptions.py). --transport adds UDP and Unix socket servers carrying
+the same messages (see transports.py).
+
 Usage:
-    python hand_tracker.py [--port 8765] [--camera 0] [--show-preview]
+    python hand_tracker.py [--port 8765] [--camera 0 | --source SPEC [--fast]] [--show-preview]
+                           [--running-mode live_stream] [--send-on-change] [--record FILE | --replay FILE]
+                           [--model VARIANT|auto [--no-download]]
+    python hand_tracker.py --probe-camera [--camera 0]   # then start normally to use the profile
 """
 
 import argparse
 import asyncio
+import collections
+import functools
 import json
 import signal
+import socket
 import sys
-import urllib.request
+import threading
+import time
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Optional
 
-import cv2
 import numpy as np
 
-# MediaPipe Tasks API
-import mediapipe as mp
-from mediapipe.tasks import python as mp_python
-from mediapipe.tasks.python import vision
-
 import websockets
 
+import wire_format
+from inference_pool import ORDERS, InferencePool
+from metrics import PipelineMetrics
+from models import (BACKENDS, DEFAULT_ACCURACY_FLOOR, DEFAULT_VARIANTS, VARIANTS, ModelCache, ModelError,
+                    load_registry, select_variant, time_inference)
+from prediction import InferenceScheduler, MotionPredictor
+from quality import QualityController
+from gesture_events import GestureEngine, INTERACTIONS, parse_hold_times
+from geometric_gestures import GeometricGestureRecognizer, geometric_callback
+from hand_frame import HandFrame, LEFT, RIGHT
+from recording import LandmarkRecorder, load_recording, record_to_frame
+from roi import FULL_FRAME, RoiTracker, remap_to_frame
+from smoothing import create_smoother
+from subscriptions import Subscription, encode_variant, parse_subscription
+from transports import TRANSPORTS, UNIX_SOCKETS_SUPPORTED, serve_udp, serve_unix
+
+# OpenCV and the MediaPipe Tasks API are imported by load_vision_modules() so
+# that replay mode starts without paying for them.
+cv2 = None
+mp = None
+mp_python = None
+vision = None
+
+# Startup timeline: seconds from module load to each milestone, see mark_startup()
+STARTUP_CLOCK = time.monotonic()
+startup_times: dict = {}
+tracker_status = "warming_up"  # -> "ready" once the first frame is processed
+
 # Global state
-connected_clients: set = set()
+connected_clients: dict = {}  # websocket -> ClientSender
 should_exit = False
-latest_frame_data: Optional[dict] = None
-
-# Model path - using GestureRecognizer for gesture detection
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "gesture_recognizer.task")
-MODEL_URL = "https://storage.googleapis.com/mediapipe-models/gesture_recognizer/gesture_recognizer/float16/1/gesture_recognizer.task"
+latest_frame: Optional[HandFrame] = None
+change_detector: Optional["ChangeDetector"] = None  # Set when --send-on-change is on
+client_queue_size = 4
+drop_policy = "drop-oldest"
+send_buffer_size = 4096  # SO_SNDBUF of client sockets, 0: the OS default
+metrics = PipelineMetrics()
+embed_timings = False
+smoother = None  # OneEuroFilter / EmaFilter when --smoothing is on
+scheduler: Optional[InferenceScheduler] = None  # Set when --infer-every skips frames
+quality: Optional[QualityController] = None  # Set when --latency-budget is on
+inference_scale = 1.0  # Extra downscale of the inference image, set by the quality controller
+gesture_hold_times: dict = {}
+gesture_release_grace = 0.15
+backend = "gesture_recognizer"  # Or "landmarker", see geometric_gestures.py
+
+# Model variants (see models.py): the --model choice, resolved to a verified
+# bundle in the cache by download_model()
+model_cache = ModelCache()
+model_choice: Optional[str] = None  # A variant name, "auto", or None for the backend's default
+model_path: Optional[str] = None
+accuracy_floor = DEFAULT_ACCURACY_FLOOR
+model_sample: Optional[str] = None  # Frame source --model auto times the variants on
+remeasure_models = False
+
+# Capture mode picked by --probe-camera (see camera_probe.py), loaded at startup if present
+CAMERA_PROFILE_PATH = os.path.join(os.path.dirname(__file__), "camera_profile.json")
 
 # Hand connections for drawing
 HAND_CONNECTIONS = [
@@ -46,312 +104,1716 @@ HAND_CONNECTIONS = [
     (0, 17), (17, 18), (18, 19), (19, 20), # Pinky
     (5, 9), (9, 13), (13, 17)            # Palm
 ]
+HAND_CONNECTION_INDEX = np.array(HAND_CONNECTIONS)
 
 
 def download_model():
-    """Download the hand landmarker model if not present."""
-    if os.path.exists(MODEL_PATH):
-        return True
+    """Make the selected model variant available, verified; False if it cannot be.
 
-    print(f"Downloading hand landmarker model...")
+    Resolves --model (timing the installed variants for auto) on first use
+    and sets the backend to the chosen variant's.
+    """
+    global model_path, backend
     try:
-        urllib.request.urlretrieve(MODEL_URL, MODEL_PATH)
-        print("Model downloaded successfully!")
+        if model_path:
+            return True
+        variant = choose_model() if model_choice == "auto" else VARIANTS[model_choice or DEFAULT_VARIANTS[backend]]
+        model_path = model_cache.fetch(variant)
+        backend = variant.backend
+        print(f"Model: {variant.name} ({model_path})")
         return True
-    except Exception as e:
-        print(f"Failed to download model: {e}")
+    except ModelError as e:
+        print(f"Model error: {e}")
         return False
 
 
-def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully."""
-    global should_exit
-    print("\nShutting down...")
-    should_exit = True
+def choose_model():
+    """--model auto: the fastest installed variant meeting the accuracy floor.
 
+    Falls back to the backend's default variant when none qualifies, or when the
+    variants need timing and there is no --model-sample.
+    """
+    images = []
 
-def process_hand_landmarks(hand_landmarks, handedness: str) -> dict:
-    """Convert MediaPipe hand landmarks to serializable dict."""
-    landmarks = []
-    for i, lm in enumerate(hand_landmarks):
-        landmarks.append({
-            "id": i,
-            "x": round(lm.x, 4),
-            "y": round(lm.y, 4),
-            "z": round(lm.z, 4)
-        })
+    def measure(variant, path):
+        if model_sample is None:
+            raise ModelError(f"--model auto has to time {variant.name} and needs --model-sample, a clip with "
+                             f"hands, for it")
+        if not images:
+            images.extend(sample_images(model_sample))
+        recognizer = create_recognizer(model_path=path, model_backend=variant.backend)
+        try:
+            return time_inference(recognizer, images)
+        finally:
+            recognizer.close()
 
-    return {
-        "handedness": handedness,
-        "landmarks": landmarks
-    }
+    try:
+        variant, report = select_variant(model_cache, measure, accuracy_floor, remeasure_models, model_sample)
+    except ModelError as e:
+        variant = VARIANTS[DEFAULT_VARIANTS[backend]]
+        print(f"{e}; using {variant.name}")
+        return variant
+    if not report["latency_ms"]:
+        print(f"Auto model selection: {variant.name} is the only variant meeting the accuracy floor")
+        return variant
+    timings = ", ".join(f"{name} {latency:.1f} ms" for name, latency in report["latency_ms"].items())
+    print(f"Auto model selection ({'measured' if report['measured'] else 'stored timings'}): {timings}")
+    return variant
+
+
+def sample_images(spec: str, count: int = 10) -> list:
+    """A few prepared frames of a frame source, as MediaPipe images."""
+    load_vision_modules()
+    import frame_sources  # Imports OpenCV, so not at module load
+
+    source = frame_sources.open_source(spec, realtime=False, loop=True)
+    try:
+        images = []
+        while len(images) < count:
+            ret, frame = source.read()
+            if not ret:
+                break
+            images.append(prepare_frame(frame)[1])
+    finally:
+        source.release()
+    if not images:
+        raise ModelError(f"No frames from {spec} to time models on")
+    return images
+
+
+def model_file(model_backend: str) -> str:
+    """The selected model, or another backend's default variant."""
+    if model_backend == backend and model_path:
+        return model_path
+    return model_cache.path(VARIANTS[DEFAULT_VARIANTS[model_backend]])
+
+
+class FrameGrabber:
+    """Reads the camera on a dedicated thread, keeping only the newest frame.
+
+    cap.read() blocks until the driver hands over a frame, so it must not run on
+    the event loop. Frames that arrive before the previous one was consumed are
+    overwritten (latest-frame-wins), so inference never works through a backlog
+    of stale images.
+
+    Frames are read into a small ring of preallocated buffers (cap.read(buffer))
+    instead of a new array per frame. A frame returned by wait_for_frame stays
+    valid until the consumer's next wait_for_frame call; copy it to keep it.
+
+    cap is a cv2.VideoCapture or a frame_sources.FrameSource. lossless makes
+    the grabber wait until a frame was consumed before reading the next, for
+    sources read as fast as possible where every frame should be processed.
+    finished is set once a finite source has run out, or reading failed.
+    """
+
+    def __init__(self, cap, num_buffers: int = 3, lossless: bool = False):
+        self._cap = cap
+        self.lossless = lossless
+        self.finished = False
+        self._cond = threading.Condition()
+        self._buffers: list = [None] * num_buffers  # Allocated by the first read into each
+        self._write_index = 0
+        self._latest_index = -1
+        self._held_index = -1
+        self._frame = None
+        self._captured_at = 0.0
+        self._seq = 0
+        self._consumed_seq = 0
+        self._running = False
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self.dropped_frames = 0
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        try:
+            self._grab()
+        except Exception as e:
+            print(f"Frame grabber stopped: {type(e).__name__}: {e}")
+        # However the loop ended, waiters must not wait for frames that will never come
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def _grab(self):
+        while self._running:
+            if self.lossless:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._consumed_seq == self._seq or not self._running)
+            index = self._write_index
+            success, frame = self._cap.read(self._buffers[index])
+            if not success:
+                if getattr(self._cap, "finished", False):
+                    return
+                time.sleep(0.01)
+                continue
+            captured_at = time.monotonic()
+            # Keeps OpenCV's array if it had to allocate (first read, size change)
+            self._buffers[index] = frame
+
+            with self._cond:
+                if self._seq > self._consumed_seq:
+                    self.dropped_frames += 1
+                self._frame = frame
+                self._latest_index = index
+                self._captured_at = captured_at
+                self._seq += 1
+                # Next read goes to a buffer that is neither published nor being consumed
+                self._write_index = next(
+                    i for i in range(len(self._buffers)) if i not in (self._latest_index, self._held_index)
+                )
+                self._cond.notify_all()
+
+    def wait_for_frame(self, after_seq: int, timeout: float = 0.1):
+        """Block until a frame newer than after_seq exists.
+
+        Returns (seq, frame, timings) where timings holds the monotonic
+        "captured" and "dequeued" times, or (after_seq, None, None) on timeout
+        or shutdown.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq or not self._running or self.finished, timeout)
+            if self._seq <= after_seq:
+                return after_seq, None, None
+            self._consumed_seq = self._seq
+            self._held_index = self._latest_index
+            if self.lossless:
+                self._cond.notify_all()
+            timings = {"captured": self._captured_at, "dequeued": time.monotonic()}
+            return self._seq, self._frame, timings
+
+
+def load_opencv():
+    """Import OpenCV on first use (enough to open the camera)."""
+    global cv2
+    if cv2 is None:
+        import cv2 as _cv2
+        cv2 = _cv2
+
+
+def load_vision_modules():
+    """Import OpenCV and MediaPipe on first use."""
+    global mp, mp_python, vision
+    load_opencv()
+    if vision is not None:
+        return
 
+    import mediapipe as _mp
+    from mediapipe.tasks import python as _mp_python
+    from mediapipe.tasks.python import vision as _vision
+
+    mp, mp_python, vision = _mp, _mp_python, _vision
+
+
+def create_recognizer(live_stream_callback=None, model_path: Optional[str] = None, warm_up: bool = False,
+                      num_hands: int = 2, model_backend: Optional[str] = None):
+    """Build the GestureRecognizer; LIVE_STREAM mode when a callback is given.
+
+    model_backend "landmarker" builds a HandLandmarker with geometric gesture
+    classification instead (same interface and results, see
+    geometric_gestures.py); it defaults to the selected backend, and
+    model_path to the selected model (see model_file()).
+    warm_up runs one IMAGE mode inference on a blank frame, so the one-time
+    initialization cost of the first recognize() call is paid here instead
+    of on the first camera frame. LIVE_STREAM recognizers are warmed up by
+    load_recognizer() instead, through the LiveStreamResults that owns their
+    timestamps.
+    """
+    load_vision_modules()
+    model_backend = model_backend or backend
+    base_options = mp_python.BaseOptions(model_asset_path=model_path or model_file(model_backend))
+    settings = dict(
+        base_options=base_options,
+        running_mode=vision.RunningMode.LIVE_STREAM if live_stream_callback else vision.RunningMode.IMAGE,
+        num_hands=num_hands,
+        min_hand_detection_confidence=0.5,
+        min_hand_presence_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+    if model_backend == "landmarker":
+        options = vision.HandLandmarkerOptions(
+            **settings, result_callback=geometric_callback(live_stream_callback) if live_stream_callback else None
+        )
+        recognizer = GeometricGestureRecognizer(vision.HandLandmarker.create_from_options(options))
+    else:
+        options = vision.GestureRecognizerOptions(**settings, result_callback=live_stream_callback)
+        recognizer = vision.GestureRecognizer.create_from_options(options)
+    if warm_up and not live_stream_callback:
+        recognizer.recognize(blank_image())
+    return recognizer
 
-def get_hand_data(result) -> dict:
-    """Extract hand data from MediaPipe GestureRecognizer results."""
-    data = {
-        "timestamp": 0,
-        "left_hand": {},
-        "right_hand": {},
-        "num_hands": 0,
-        "gestures": {
-            "left": "None",
-            "right": "None"
-        },
-        "two_open_palms": False
-    }
 
-    if result.hand_landmarks and result.handedness:
-        data["num_hands"] = len(result.hand_landmarks)
+def blank_image():
+    """A black 640x480 MediaPipe image for warm-up inferences."""
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((480, 640, 3), dtype=np.uint8))
 
-        left_gesture = "None"
-        right_gesture = "None"
 
-        for i, (hand_landmarks, handedness_info) in enumerate(zip(
-            result.hand_landmarks,
-            result.handedness
-        )):
-            # Get handedness label
-            label = handedness_info[0].category_name
-            # Flip left/right since camera mirrors
-            actual_hand = "right_hand" if label == "Left" else "left_hand"
+def replace_recognizer(recognizer, num_hands: int):
+    """Swap in a warmed-up recognizer tracking up to num_hands hands.
+
+    Runs on the inference executor, so no frame is in flight meanwhile.
+    """
+    replacement = create_recognizer(num_hands=num_hands, warm_up=True)
+    recognizer.close()
+    return replacement
+
+
+def open_frame_source(spec: str, realtime: bool = True, loop: bool = False,
+                      width: int = 640, height: int = 480, fps: float = 30, camera_profile: Optional[str] = None):
+    """Open the capture source (see frame_sources.py); None if it cannot be opened.
+
+    A camera opens in the mode camera_profile (from --probe-camera) picked
+    for it, if the profile was probed for the same camera, size and fps.
+    """
+    load_opencv()
+    import camera_probe  # These import OpenCV, so not at module load
+    import frame_sources
+
+    try:
+        profile = camera_probe.load_profile(camera_profile) if camera_profile else None
+        source = frame_sources.open_source(spec, realtime, loop, width, height, fps, profile)
+    except (ValueError, RuntimeError, OSError, KeyError) as e:
+        print(f"Error: {e}")
+        return None
+    if isinstance(source, frame_sources.CameraSource):
+        if not source.isOpened():
+            print(f"Error: Could not open {source.name}")
+            return None
+        if profile and not source.settings:
+            requested = profile.get("requested", {})
+            print(f"Camera profile {camera_profile} is for camera {profile.get('camera')} at "
+                  f"{requested.get('width')}x{requested.get('height')}@{requested.get('fps')}; not applied")
+    mark_startup("source_open")
+    return source
+
+
+def load_recognizer(live_stream: Optional["LiveStreamResults"] = None):
+    """Fetch the model if needed and build a warmed-up recognizer; None on failure.
+
+    With live_stream, a LIVE_STREAM recognizer delivering to it.
+    """
+    if not download_model():
+        return None
+    recognizer = create_recognizer(live_stream.on_result if live_stream else None, warm_up=True)
+    if live_stream:
+        live_stream.warm_up(recognizer)
+    mark_startup("model_ready")
+    return recognizer
+
+
+def mark_startup(milestone: str):
+    """Record and log when a startup milestone was reached (first time only)."""
+    if milestone in startup_times:
+        return
+    elapsed = time.monotonic() - STARTUP_CLOCK
+    startup_times[milestone] = round(elapsed, 3)
+    print(f"[startup] {milestone.replace('_', ' ')} after {elapsed:.2f}s")
+
+
+class CaptureBuffers:
+    """Preallocated outputs for the flip / resize / color conversion steps.
+
+    An array is only (re)allocated when the frame size changes, so a steady
+    stream of same-sized frames allocates no image memory. Every array is
+    overwritten by the next frame: anything that keeps a frame must copy it.
+
+    With skip_flip the camera frame is never mirrored; inference runs on it
+    as is and HandFrame.from_result(mirrored=False) mirrors the landmarks.
+    """
+
+    def __init__(self, skip_flip: bool = False):
+        self.skip_flip = skip_flip
+        self._arrays: dict = {}
+
+    def get(self, name: str, shape: tuple) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape:
+            array = self._arrays[name] = np.empty(shape, dtype=np.uint8)
+        return array
+
+
+capture_buffers = CaptureBuffers()
+
+
+def mirror_and_crop(frame, roi: Optional[RoiTracker] = None):
+    """Mirror a BGR camera frame and cut out the part inference should see.
+
+    With capture_buffers.skip_flip the frame is left unmirrored and the crop
+    is taken from the mirrored position of the ROI. The inference image is
+    further downscaled by inference_scale (see quality.py).
+    Returns (BGR frame, BGR inference image, normalized region in mirrored
+    full-frame space).
+    """
+    if not capture_buffers.skip_flip:
+        # Flip horizontally for selfie view
+        frame = cv2.flip(frame, 1, dst=capture_buffers.get("mirrored", frame.shape))
+    if not roi and inference_scale >= 1.0:
+        return frame, frame, FULL_FRAME
+
+    height, width = frame.shape[:2]
+    if roi:
+        x0, y0, x1, y1, scale = roi.next_region(width, height)
+    else:
+        x0, y0, x1, y1, scale = 0, 0, width, height, 1.0
+    scale *= inference_scale
+    if capture_buffers.skip_flip:
+        source = frame[y0:y1, width - x1:width - x0]
+    else:
+        source = frame[y0:y1, x0:x1]
+    if scale < 1.0:
+        size = (max(int(source.shape[1] * scale), 1), max(int(source.shape[0] * scale), 1))
+        resized = capture_buffers.get("resized", frame.shape)[:size[1], :size[0]]
+        source = cv2.resize(source, size, dst=resized, interpolation=cv2.INTER_AREA)
+    return frame, source, (x0 / width, y0 / height, x1 / width, y1 / height)
+
+
+def prepare_frame(frame, roi: Optional[RoiTracker] = None):
+    """Mirror a BGR camera frame and wrap it as an RGB MediaPipe image.
+
+    With a RoiTracker only its crop of the mirrored frame, downscaled to its
+    inference size, is converted and wrapped. mp.Image copies the pixels, so
+    the RGB buffer is free for the next frame as soon as this returns.
+    Returns (BGR frame, mp.Image, normalized region the image covers); the
+    frame is mirrored unless capture_buffers.skip_flip is set.
+    """
+    frame, source, region = mirror_and_crop(frame, roi)
+
+    # Convert BGR to RGB
+    rgb_buffer = capture_buffers.get("rgb", frame.shape)[:source.shape[0], :source.shape[1]]
+    rgb_frame = cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
+
+    # Create MediaPipe Image
+    return frame, mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame), region
+
+
+def infer_latest_frame(grabber: FrameGrabber, recognizer, last_seq: int, roi: Optional[RoiTracker] = None):
+    """Wait for a fresh frame and run it through the recognizer.
+
+    Runs on the inference executor thread, never on the event loop.
+    Returns (seq, mirrored BGR frame, result, timings, region); all but seq
+    are None if no new frame arrived in time.
+    """
+    seq, frame, timings = grabber.wait_for_frame(last_seq)
+    if frame is None:
+        return seq, None, None, None, None
+
+    frame, result, region = infer_frame(recognizer, frame, timings, roi)
+    return seq, frame, result, timings, region
+
+
+def infer_frame(recognizer, frame, timings: dict, roi: Optional[RoiTracker] = None):
+    """Convert one camera frame and run the recognizer on it.
+
+    Returns (mirrored BGR frame, result, region).
+    """
+    frame, mp_image, region = prepare_frame(frame, roi)
+    timings["converted"] = time.monotonic()
+
+    # Process with MediaPipe GestureRecognizer
+    result = recognizer.recognize(mp_image)
+    timings["inferred"] = time.monotonic()
+    return frame, result, region
+
+
+def infer_or_skip_frame(grabber: FrameGrabber, recognizer, last_seq: int, predictor: MotionPredictor,
+                        roi: Optional[RoiTracker] = None):
+    """Frame-skipping variant of infer_latest_frame.
+
+    Frames the scheduler skips are returned unconverted with a None result,
+    for the caller to fill in with a prediction.
+    """
+    seq, frame, timings = grabber.wait_for_frame(last_seq)
+    if frame is None:
+        return seq, None, None, None, None
+    if not scheduler.should_infer(timings["captured"], predictor.tracking):
+        return seq, frame, None, timings, None
+
+    frame, result, region = infer_frame(recognizer, frame, timings, roi)
+    scheduler.record_inference(timings["inferred"] - timings["converted"])
+    return seq, frame, result, timings, region
+
+
+class LiveStreamResults:
+    """Bridges LIVE_STREAM result callbacks back onto the asyncio loop.
+
+    Also used for InferencePool results, which arrive on its collector thread
+    keyed by the same timestamps.
+
+    MediaPipe invokes the callback on its own thread, so results are handed to
+    the loop with call_soon_threadsafe. The mirrored BGR frame for each
+    submitted timestamp is kept until its result arrives so the preview can
+    draw on it; MediaPipe silently skips frames while busy, so older entries
+    are discarded whenever a newer result comes in.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, keep_frames: bool = False):
+        self._loop = loop
+        self.keep_frames = keep_frames  # Copy frames for the preview (capture buffers get reused)
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._pending_frames: dict = {}
+        self._lock = threading.Lock()
+        self._last_timestamp_ms = 0
+        self._warm_up: Optional[tuple] = None  # (timestamp_ms, threading.Event) of a warm-up inference
+
+    def next_timestamp_ms(self) -> int:
+        """Monotonic, strictly increasing timestamp as required by recognize_async."""
+        timestamp_ms = max(time.monotonic_ns() // 1_000_000, self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def warm_up(self, recognizer, timeout: float = 10.0):
+        """Run one recognize_async on a blank frame and wait for its (dropped) result.
+
+        Pays the one-time initialization cost of the first LIVE_STREAM
+        inference before the first camera frame; blocks, so call it off the
+        event loop.
+        """
+        done = threading.Event()
+        timestamp_ms = self.next_timestamp_ms()
+        with self._lock:
+            self._warm_up = (timestamp_ms, done)
+        recognizer.recognize_async(blank_image(), timestamp_ms)
+        if not done.wait(timeout):
+            print("LIVE_STREAM warm-up result did not arrive; continuing")
+        with self._lock:
+            self._warm_up = None
+
+    def track_frame(self, timestamp_ms: int, frame, timings: dict, region: tuple = FULL_FRAME):
+        frame = frame.copy() if self.keep_frames else None
+        with self._lock:
+            self._pending_frames[timestamp_ms] = (frame, timings, region)
+
+    def on_result(self, result, output_image, timestamp_ms: int):
+        inferred_at = time.monotonic()
+        with self._lock:
+            if self._warm_up and self._warm_up[0] == timestamp_ms:
+                self._warm_up[1].set()
+                return
+            frame, timings, region = self._pending_frames.pop(timestamp_ms, (None, None, FULL_FRAME))
+            for stale in [ts for ts in self._pending_frames if ts < timestamp_ms]:
+                del self._pending_frames[stale]
+        if timings is not None:
+            timings["inferred"] = inferred_at
+        try:
+            self._loop.call_soon_threadsafe(self._results.put_nowait, (frame, result, timings, region))
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    async def next_result(self, timeout: float):
+        """Return the next (frame, result, timings, region), or Nones after timeout."""
+        try:
+            return await asyncio.wait_for(self._results.get(), timeout)
+        except asyncio.TimeoutError:
+            return None, None, None, None
 
-            data[actual_hand] = process_hand_landmarks(
-                hand_landmarks,
-                actual_hand.replace("_hand", "")
-            )
 
-            # Get gesture for this hand
-            if result.gestures and i < len(result.gestures) and result.gestures[i]:
-                gesture_name = result.gestures[i][0].category_name
-                if actual_hand == "left_hand":
-                    left_gesture = gesture_name
-                else:
-                    right_gesture = gesture_name
+def submit_latest_frame(live_stream: LiveStreamResults, grabber: FrameGrabber, recognizer, last_seq: int,
+                        roi: Optional[RoiTracker] = None) -> int:
+    """Wait for a fresh frame and hand it to recognize_async. Returns its seq."""
+    seq, frame, timings = grabber.wait_for_frame(last_seq)
+    if frame is None:
+        return seq
 
-        data["gestures"]["left"] = left_gesture
-        data["gestures"]["right"] = right_gesture
+    frame, mp_image, region = prepare_frame(frame, roi)
+    timings["converted"] = time.monotonic()
 
-        # Check for two open palms (CATCH gesture)
-        data["two_open_palms"] = (left_gesture == "Open_Palm" and right_gesture == "Open_Palm")
+    timestamp_ms = live_stream.next_timestamp_ms()
+    live_stream.track_frame(timestamp_ms, frame, timings, region)
+    recognizer.recognize_async(mp_image, timestamp_ms)
+    return seq
 
-    return data
 
+async def feed_live_stream(live_stream: LiveStreamResults, grabber: FrameGrabber, recognizer, executor,
+                           roi: Optional[RoiTracker] = None):
+    """Submit every new camera frame to the LIVE_STREAM recognizer."""
+    loop = asyncio.get_running_loop()
+    last_seq = 0
+    while not should_exit:
+        last_seq = await loop.run_in_executor(
+            executor, submit_latest_frame, live_stream, grabber, recognizer, last_seq, roi
+        )
 
-def draw_landmarks(frame, result):
-    """Draw hand landmarks on frame."""
-    if not result.hand_landmarks:
-        return frame
 
-    h, w, _ = frame.shape
+def submit_to_pool(live_stream: LiveStreamResults, pool: InferencePool, grabber: FrameGrabber, last_seq: int,
+                   roi: Optional[RoiTracker] = None) -> int:
+    """Wait for a fresh frame and queue it on the worker pool. Returns its seq.
 
-    for hand_landmarks in result.hand_landmarks:
-        # Draw landmarks
-        for lm in hand_landmarks:
-            x, y = int(lm.x * w), int(lm.y * h)
-            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
+    Blocks while every pool slot is in flight.
+    """
+    seq, frame, timings = grabber.wait_for_frame(last_seq)
+    if frame is None:
+        return seq
 
-        # Draw connections
-        for start, end in HAND_CONNECTIONS:
-            x1, y1 = int(hand_landmarks[start].x * w), int(hand_landmarks[start].y * h)
-            x2, y2 = int(hand_landmarks[end].x * w), int(hand_landmarks[end].y * h)
-            cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    frame, source, region = mirror_and_crop(frame, roi)
+    timings["converted"] = time.monotonic()
 
-    return frame
+    timestamp_ms = live_stream.next_timestamp_ms()
+    live_stream.track_frame(timestamp_ms, frame, timings, region)
+    if not pool.submit(source, timestamp_ms) and not pool.error:
+        print(f"Frame {source.shape[1]}x{source.shape[0]} does not fit the inference pool slots")
+    return seq
 
 
-async def broadcast_data(data: dict):
-    """Send data to all connected WebSocket clients."""
+async def feed_pool(live_stream: LiveStreamResults, pool: InferencePool, grabber: FrameGrabber, executor,
+                    roi: Optional[RoiTracker] = None):
+    """Submit every new camera frame to the inference worker pool.
+
+    Stops the tracker if the pool fails, e.g. a worker process died.
+    """
+    global should_exit
+    loop = asyncio.get_running_loop()
+    last_seq = 0
+    while not should_exit:
+        if pool.error:
+            print(f"Error: {pool.error}")
+            should_exit = True
+            return
+        last_seq = await loop.run_in_executor(
+            executor, submit_to_pool, live_stream, pool, grabber, last_seq, roi
+        )
+
+
+def start_inference_pool(workers: int, order: str, frame_shape: tuple,
+                         live_stream: LiveStreamResults) -> Optional[InferencePool]:
+    """Start the worker processes and wait for their models; None on failure."""
+    # Workers start with fresh module globals, so the model is passed along
+    factory = functools.partial(create_recognizer, warm_up=True, model_path=model_path, model_backend=backend)
+    pool = InferencePool(
+        workers, factory, frame_shape,
+        lambda timestamp_ms, frame, started, finished: live_stream.on_result(frame, None, timestamp_ms),
+        order, mirrored=not capture_buffers.skip_flip
+    )
+    try:
+        pool.wait_ready()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        pool.close()
+        return None
+    mark_startup("model_ready")
+    return pool
+
+
+def signal_handler(sig, frame):
+    """Handle Ctrl+C gracefully."""
+    global should_exit
+    print("\nShutting down...")
+    should_exit = True
+
+
+def get_hand_data(result) -> dict:
+    """Extract hand data from MediaPipe GestureRecognizer (or geometric backend) results as a JSON payload."""
+    return HandFrame.from_result(result).to_payload()
+
+
+def draw_landmarks(image, frame: HandFrame):
+    """Draw hand landmarks on image."""
+    if not frame.num_hands:
+        return image
+
+    h, w, _ = image.shape
+
+    # Pixel coordinates for every landmark, computed once per frame
+    points = np.rint(frame.landmarks[frame.present, :, :2] * (w, h)).astype(np.int32)
+
+    # Draw all connections of both hands in one call
+    cv2.polylines(image, points[:, HAND_CONNECTION_INDEX].reshape(-1, 2, 2), False, (0, 255, 0), 2)
+
+    # Draw landmarks as single-point polylines: a thickness-10 dot is a radius-5 filled circle
+    cv2.polylines(image, points.reshape(-1, 1, 2), True, (0, 255, 0), 10)
+
+    return image
+
+
+class ChangeDetector:
+    """Decides which frames are worth sending in change-driven mode.
+
+    A frame goes out only when the hand count, which hands are present, the
+    gestures, or any landmark (by more than epsilon) differ from the last frame
+    sent. Hands appearing or disappearing also produce explicit tracking_found /
+    tracking_lost events, and send_heartbeats() keeps idle links alive.
+    """
+
+    def __init__(self, epsilon: float, heartbeat_interval: float):
+        self.epsilon = epsilon
+        self.heartbeat_interval = heartbeat_interval
+        self.tracking = False
+        self.last_sent_time = 0.0
+        self._last_key = None
+        self._last_landmarks: Optional[np.ndarray] = None
+
+    def messages_for(self, frame: HandFrame) -> list:
+        """Return the messages to broadcast for this frame, possibly none."""
+        messages = []
+        tracking = frame.num_hands > 0
+
+        if tracking and not self.tracking:
+            messages.append({"type": "tracking_found", "timestamp": frame.timestamp})
+
+        key = (frame.num_hands, *frame.present.tolist(), *frame.gestures.tolist())
+        landmarks = frame.landmarks[frame.present]
+        if (key != self._last_key or self._last_landmarks is None
+                or (landmarks.size and np.abs(landmarks - self._last_landmarks).max() > self.epsilon)):
+            messages.append(frame)
+            self._last_key = key
+            self._last_landmarks = landmarks
+
+        if self.tracking and not tracking:
+            messages.append({"type": "tracking_lost", "timestamp": frame.timestamp})
+        self.tracking = tracking
+
+        if messages:
+            self.last_sent_time = time.monotonic()
+        return messages
+
+    def hello_message(self) -> dict:
+        """Sent to each client on connect so it relies on events, not gaps."""
+        return {
+            "type": "hello",
+            "change_driven": True,
+            "heartbeat_interval": self.heartbeat_interval,
+            "tracking": self.tracking
+        }
+
+
+class ClientSender:
+    """Per-connection outbound queue drained by its own sender task.
+
+    Broadcasting only enqueues, so a slow or stalled client never delays the
+    capture loop or other clients. When the queue is full, frames are dropped
+    according to the drop policy: "drop-oldest" discards the oldest queued
+    frame, "latest" keeps only the newest one. Control messages (tracking
+    events, replies) are never dropped.
+
+    A send only completes once the socket has taken the whole message (the
+    server runs with write_limit=0), the socket's send buffer is capped
+    (--send-buffer) and frames are not compressed, so a client that reads
+    slowly backs up into this queue, where the drop policy applies, rather
+    than into buffers nothing drops from. What remains is on the client
+    side: its kernel receive buffer and its WebSocket library's queue (16
+    messages with websockets by default) hold frames it has not read yet,
+    and only the client can shrink those.
+    """
+
+    def __init__(self, websocket, max_queue: int, drop_policy: str):
+        self.websocket = websocket
+        self.subprotocol = websocket.subprotocol
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        # Set once the client asks for server-side gesture events
+        self.gesture_engine: Optional[GestureEngine] = None
+        self.wants_frames = True
+        # Full frames in the negotiated format until the client subscribes
+        self.subscription = Subscription(encoding=self.subprotocol)
+        self._queue = collections.deque()  # (queued_at, message, droppable, captured_at)
+        self._held: Optional[tuple] = None  # (frame, captured_at) waiting for the rate limit
+        self._held_timer: Optional[asyncio.TimerHandle] = None
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, message, droppable: bool = True, captured_at: Optional[float] = None):
+        if droppable:
+            limit = 1 if self.drop_policy == "latest" else self.max_queue
+            while sum(1 for entry in self._queue if entry[2]) >= limit:
+                self._drop_oldest_frame()
+        self._queue.append((time.monotonic(), message, droppable, captured_at))
+        self._wakeup.set()
+
+    def hold(self, frame: HandFrame, captured_at: Optional[float] = None):
+        """Keep a frame the rate limit skipped, to send once the next slot opens.
+
+        Only the latest held frame is sent, and only if no newer frame went
+        out first (see send_frame).
+        """
+        self._held = (frame, captured_at)
+        if self._held_timer is None:
+            delay = self.subscription.frame_wait(time.monotonic())
+            self._held_timer = asyncio.get_running_loop().call_later(delay, self._release_held)
+
+    def send_frame(self, message, captured_at: Optional[float] = None):
+        """Queue an encoded frame, superseding any held one."""
+        self._held = None
+        self.enqueue(message, True, captured_at)
+
+    def _release_held(self):
+        self._held_timer = None
+        if self._held is None:
+            return
+        now = time.monotonic()
+        if not self.subscription.frame_due(now):  # Timers may fire a little early
+            self._held_timer = asyncio.get_running_loop().call_later(self.subscription.frame_wait(now),
+                                                                     self._release_held)
+            return
+        (frame, captured_at), self._held = self._held, None
+        variant = self.subscription.variant  # The client may have resubscribed meanwhile
+        if self.wants_frames and variant is not None:
+            self.enqueue(encode_variant(frame, variant), True, captured_at)
+
+    def _drop_oldest_frame(self):
+        for entry in self._queue:
+            if entry[2]:
+                self._queue.remove(entry)
+                self.dropped += 1
+                return
+
+    async def _run(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                queued_at, message, _, captured_at = self._queue.popleft()
+                await self.websocket.send(message)
+                sent_at = time.monotonic()
+                self.sent += 1
+                self.last_lag = sent_at - queued_at
+                self.max_lag = max(self.max_lag, self.last_lag)
+                metrics.record("send", self.last_lag)
+                if captured_at is not None:
+                    metrics.record("total", sent_at - captured_at)
+        except (websockets.exceptions.ConnectionClosed, ConnectionError):
+            pass
+
+    def close(self):
+        self._task.cancel()
+        if self._held_timer:
+            self._held_timer.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "address": f"{self.websocket.remote_address[0]}:{self.websocket.remote_address[1]}",
+            "protocol": self.subprotocol or "json",
+            "subscription": self.subscription.describe(),
+            "queued": len(self._queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2)
+        }
+
+
+def broadcast_data(message, captured_at: Optional[float] = None):
+    """Queue a HandFrame or control message for every connected WebSocket client.
+
+    Never waits on sends. captured_at is the camera capture time of the frame,
+    for end-to-end latency. Frames go to each client as its subscription asks;
+    control messages (plain dicts with a "type") are always JSON text. In
+    change-driven mode a frame the rate limit skips is held for later, as it
+    may be the last change for a while.
+    """
     if not connected_clients:
         return
 
-    message = json.dumps(data)
-    disconnected = set()
+    if not isinstance(message, HandFrame):
+        text = json.dumps(message)
+        droppable = message.get("type") == "heartbeat"
+        for sender in connected_clients.values():
+            sender.enqueue(text, droppable, captured_at)
+        return
+
+    # Encode once per subscribed variant, not once per client
+    encoded = {}
+    now = time.monotonic()
+    for sender in connected_clients.values():
+        variant = sender.subscription.variant
+        if not sender.wants_frames or variant is None:
+            continue
+        if not sender.subscription.frame_due(now):
+            if change_detector:
+                sender.hold(message, captured_at)
+            continue
+        if variant not in encoded:
+            encoded[variant] = encode_variant(message, variant)
+        sender.send_frame(encoded[variant], captured_at)
+
+
+def status_message() -> dict:
+    message = {"type": "status", "status": tracker_status}
+    if quality:
+        message["quality"] = quality.describe()
+    return message
+
+
+def apply_quality_change(change: dict):
+    """Switch inference resolution and interval to the controller's new level.
+
+    num_hands needs a new recognizer, which the capture loop swaps in. Every
+    client is told about the change in a status message.
+    """
+    global inference_scale
+    level = quality.current
+    inference_scale = level["scale"]
+    if scheduler and not scheduler.auto:
+        scheduler.interval = level["infer_every"]
+    print(f"Quality level {change['level']}/{change['levels'] - 1} ({change['reason']}, "
+          f"{change['latency_ms']} ms): scale {level['scale']}, every {level['infer_every']} frame(s), "
+          f"{level['num_hands']} hand(s)")
+    broadcast_data({"type": "status", "status": tracker_status, "quality": change})
+
+
+def set_tracker_status(status: str):
+    """Change the bridge status and tell every client."""
+    global tracker_status
+    if status != tracker_status:
+        tracker_status = status
+        broadcast_data(status_message())
+
+
+def client_stats() -> list:
+    return [sender.stats() for sender in connected_clients.values()]
+
+
+async def send_heartbeats(detector: ChangeDetector):
+    """Broadcast a heartbeat whenever nothing else was sent for a full interval."""
+    while not should_exit:
+        idle = time.monotonic() - detector.last_sent_time
+        if idle < detector.heartbeat_interval:
+            await asyncio.sleep(detector.heartbeat_interval - idle)
+            continue
+        detector.last_sent_time = time.monotonic()
+        broadcast_data({"type": "heartbeat", "tracking": detector.tracking})
+
+
+async def send_subscribed_metrics(tick: float = 0.1):
+    """Queue the metrics message for clients subscribed to it, at their rates."""
+    while not should_exit:
+        await asyncio.sleep(tick)
+        now = time.monotonic()
+        due = [
+            sender for sender in connected_clients.values()
+            if sender.subscription.wants_metrics and sender.subscription.metrics_due(now)
+        ]
+        if due:
+            text = json.dumps(metrics_message())  # Built once for all of them
+            for sender in due:
+                sender.enqueue(text)
+
+
+def select_subprotocol(connection, subprotocols):
+    """Pick the binary wire format a client asked for; None keeps it on JSON."""
+    for protocol in wire_format.SUBPROTOCOLS:
+        if protocol in subprotocols:
+            return protocol
+    return None
+
+
+async def handle_client_message(sender: ClientSender, message):
+    """Respond to requests sent by a client over its socket."""
+    if not isinstance(message, str):
+        return
+    try:
+        request = json.loads(message)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(request, dict):
+        return
 
-    for client in list(connected_clients):  # Copy to list to avoid modification during iteration
+    if request.get("type") == "get_stats":
+        sender.enqueue(json.dumps({"type": "stats", "clients": client_stats()}), droppable=False)
+    elif request.get("type") == "get_metrics":
+        sender.enqueue(json.dumps(metrics_message()), droppable=False)
+    elif request.get("type") == "ping":
+        # Echoed straight back, for measuring transport round trips
+        sender.enqueue(json.dumps({"type": "pong", "t": request.get("t")}), droppable=False)
+    elif request.get("type") == "gesture_events":
+        configure_gesture_events(sender, request)
+    elif request.get("type") == "subscribe":
         try:
-            await client.send(message)
-        except websockets.exceptions.ConnectionClosed:
-            disconnected.add(client)
+            sender.subscription = parse_subscription(request, sender.subprotocol)
+        except ValueError as e:
+            sender.enqueue(json.dumps({"type": "error", "message": str(e)}), droppable=False)
+            return
+        sender.enqueue(json.dumps(sender.subscription.describe()), droppable=False)
+
+
+def configure_gesture_events(sender: ClientSender, request: dict):
+    """Turn on server-side gesture events for a client and update its context.
+
+    {"type": "gesture_events", "expected": "BALLOON", "frames": false}
+    "expected" is the interaction the client is waiting for; "frames": false
+    stops landmark frames so the client only gets events.
+    """
+    if sender.gesture_engine is None:
+        sender.gesture_engine = GestureEngine(gesture_hold_times, gesture_release_grace)
+
+    expected = str(request.get("expected", sender.gesture_engine.expected)).upper()
+    if expected not in INTERACTIONS:
+        sender.enqueue(json.dumps({"type": "error", "message": f"Unknown gesture: {expected}"}), droppable=False)
+        return
+    sender.gesture_engine.set_expected(expected)
+
+    if "frames" in request:
+        sender.wants_frames = bool(request["frames"])
+
+
+def update_gesture_engines(frame: HandFrame, now: float):
+    """Feed every frame to the clients' gesture engines and queue their events."""
+    for sender in connected_clients.values():
+        if sender.gesture_engine is None:
+            continue
+        for event in sender.gesture_engine.update(frame, now):
+            sender.enqueue(json.dumps(event), droppable=event["type"] == "gesture_progress")
+
 
-    connected_clients.difference_update(disconnected)
+def metrics_message() -> dict:
+    message = {"type": "metrics", **metrics.snapshot(), "clients": client_stats(),
+               "status": tracker_status, "startup": startup_times}
+    if scheduler:
+        message["frame_skipping"] = scheduler.stats()
+    if quality:
+        message["quality"] = {**quality.describe(), "changes": quality.changes}
+    return message
+
+
+def process_http_request(connection, request):
+    """Serve GET /metrics as JSON on the WebSocket port; let other paths upgrade."""
+    if request.path == "/metrics":
+        return connection.respond(HTTPStatus.OK, json.dumps(metrics_message()) + "\n")
+    return None
+
+
+def limit_send_buffer(websocket):
+    """Cap the kernel send buffer of a client socket at send_buffer_size."""
+    transport = getattr(websocket, "transport", None)  # UDP clients share one socket
+    sock = transport.get_extra_info("socket") if transport else None
+    if sock is None or not send_buffer_size:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer_size)
+    except OSError as e:
+        print(f"Could not limit the send buffer of {websocket.remote_address}: {e}")
 
 
 async def websocket_handler(websocket):
-    """Handle new WebSocket connections."""
-    connected_clients.add(websocket)
+    """Handle new WebSocket connections, and transports.py clients alike."""
+    limit_send_buffer(websocket)
+    sender = ClientSender(websocket, client_queue_size, drop_policy)
+    connected_clients[websocket] = sender
     client_addr = websocket.remote_address
-    print(f"Client connected: {client_addr}")
+    print(f"Client connected: {client_addr} ({websocket.subprotocol or 'json'})")
 
     try:
+        sender.enqueue(json.dumps(status_message()), droppable=False)
+        if change_detector:
+            sender.enqueue(json.dumps(change_detector.hello_message()), droppable=False)
         async for message in websocket:
-            pass
+            await handle_client_message(sender, message)
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
-        connected_clients.discard(websocket)
-        print(f"Client disconnected: {client_addr}")
+        connected_clients.pop(websocket, None)
+        sender.close()
+        print(f"Client disconnected: {client_addr} (sent {sender.sent}, dropped {sender.dropped})")
 
 
-async def capture_and_process(camera_index: int, show_preview: bool):
-    """Main capture loop."""
-    global latest_frame_data, should_exit
+def record_stage_timings(timings: dict):
+    """Feed a frame's capture/convert/inference stamps into the histograms."""
+    metrics.record("frame_age", timings["dequeued"] - timings["captured"])
+    metrics.record("convert", timings["converted"] - timings["dequeued"])
+    metrics.record("inference", timings["inferred"] - timings["converted"])
 
-    # Download model if needed
-    if not download_model():
-        print("Cannot proceed without model file.")
-        should_exit = True
-        return
 
-    cap = cv2.VideoCapture(camera_index)
+def stage_timings_ms(timings: dict) -> dict:
+    """Per-stage durations for embedding in the JSON payload.
 
-    if not cap.isOpened():
-        print(f"Error: Could not open camera {camera_index}")
-        should_exit = True
-        return
+    captured_at is on the time.monotonic() clock, so a client on the same
+    host can measure end-to-end delivery latency (see load_test.py).
+    """
+    return {
+        "frame_age_ms": round((timings["dequeued"] - timings["captured"]) * 1000, 2),
+        "convert_ms": round((timings["converted"] - timings["dequeued"]) * 1000, 2),
+        "inference_ms": round((timings["inferred"] - timings["converted"]) * 1000, 2),
+        "since_capture_ms": round((time.monotonic() - timings["captured"]) * 1000, 2),
+        "captured_at": round(timings["captured"], 6)
+    }
 
-    # Set camera properties
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    cap.set(cv2.CAP_PROP_FPS, 30)
 
-    print(f"Camera {camera_index} opened successfully")
-    print(f"Resolution: {int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}")
+class PreviewWindow:
+    """Renders the preview window on its own thread.
+
+    The capture loop only calls submit(), which copies the camera frame into
+    a preview-owned buffer (flipping it if unmirrored) and replaces whatever
+    the thread has not drawn yet (latest-only). Frames beyond max_fps are
+    not copied at all, so the preview costs tracking at most one memcpy per
+    shown frame. All HighGUI calls happen on the preview thread.
+    """
+
+    def __init__(self, max_fps: float = 15.0):
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._cond = threading.Condition()
+        self._buffers = [None, None]  # Being drawn, pending
+        self._pending_frame: Optional[HandFrame] = None
+        self._last_submit = 0.0
+        self._running = False
+        self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def submit(self, image, frame: HandFrame, mirrored: bool = True):
+        now = time.monotonic()
+        if image is None or now - self._last_submit < self.min_interval:
+            return
+        self._last_submit = now
+
+        with self._cond:
+            buffer = self._buffers[1]
+            if buffer is None or buffer.shape != image.shape:
+                buffer = self._buffers[1] = np.empty_like(image)
+            if mirrored:
+                np.copyto(buffer, image)
+            else:
+                cv2.flip(image, 1, dst=buffer)
+            self._pending_frame = frame
+            self._cond.notify_all()
+
+    def _run(self):
+        global should_exit
+        try:
+            while self._running:
+                with self._cond:
+                    # Wake up now and then anyway so waitKey keeps the window responsive
+                    self._cond.wait_for(lambda: self._pending_frame is not None or not self._running, 0.05)
+                    frame, self._pending_frame = self._pending_frame, None
+                    if frame is not None:
+                        self._buffers.reverse()
+                if frame is not None:
+                    show_preview_frame(self._buffers[0], frame)
+                elif cv2.waitKey(1) & 0xFF == ord('q'):
+                    should_exit = True
+        finally:
+            cv2.destroyAllWindows()
 
-    # Create gesture recognizer
-    base_options = mp_python.BaseOptions(model_asset_path=MODEL_PATH)
-    options = vision.GestureRecognizerOptions(
-        base_options=base_options,
-        running_mode=vision.RunningMode.IMAGE,
-        num_hands=2,
-        min_hand_detection_confidence=0.5,
-        min_hand_presence_confidence=0.5,
-        min_tracking_confidence=0.5
+
+def show_preview_frame(preview_frame, frame: HandFrame):
+    """Draw landmarks and gesture status into preview_frame and show it.
+
+    Runs on the preview thread; preview_frame is a mirrored copy it owns.
+    """
+    global should_exit
+
+    draw_landmarks(preview_frame, frame)
+
+    # Add status text
+    status = f"Hands: {frame.num_hands} | Clients: {len(connected_clients)}"
+    cv2.putText(
+        preview_frame, status, (10, 30),
+        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2
     )
 
-    recognizer = vision.GestureRecognizer.create_from_options(options)
+    # Show gestures
+    left_g = frame.gesture_name(LEFT)
+    right_g = frame.gesture_name(RIGHT)
+    gesture_text = f"L: {left_g} | R: {right_g}"
+    cv2.putText(
+        preview_frame, gesture_text, (10, 60),
+        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2
+    )
 
-    frame_count = 0
+    # Show detected gesture
+    if frame.two_open_palms:
+        cv2.putText(
+            preview_frame, "CATCH! (2 palms)", (10, 100),
+            cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 3
+        )
+    elif left_g == "Open_Palm" or right_g == "Open_Palm":
+        cv2.putText(
+            preview_frame, "1 HAND PASS", (10, 100),
+            cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3
+        )
+
+    cv2.imshow("Hand Tracking", preview_frame)
+
+    if cv2.waitKey(1) & 0xFF == ord('q'):
+        should_exit = True
 
-    try:
-        while not should_exit:
-            success, frame = cap.read()
-            if not success:
-                await asyncio.sleep(0.01)
-                continue
 
-            frame_count += 1
+def publish_frame(frame: HandFrame, captured_at: Optional[float] = None, frame_time: Optional[float] = None):
+    """Smooth frame, make it the latest one and queue it (or its changes) for clients.
 
-            # Flip horizontally for selfie view
-            frame = cv2.flip(frame, 1)
+    frame_time is the clock the smoother runs on; it defaults to captured_at.
+    """
+    global latest_frame
 
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if frame_time is None:
+        frame_time = captured_at if captured_at is not None else time.monotonic()
+    if smoother:
+        smoother.apply(frame, frame_time)
+    latest_frame = frame
 
-            # Create MediaPipe Image
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+    # Gesture engines see every frame, even ones change detection holds back
+    update_gesture_engines(frame, frame_time)
 
-            # Process with MediaPipe GestureRecognizer
-            result = recognizer.recognize(mp_image)
+    if change_detector:
+        for message in change_detector.messages_for(frame):
+            broadcast_data(message, captured_at)
+    else:
+        broadcast_data(frame, captured_at)
 
-            # Extract hand data
-            data = get_hand_data(result)
-            data["timestamp"] = frame_count
-            latest_frame_data = data
 
-            # Broadcast to connected clients
-            await broadcast_data(data)
+async def replay_recording(path: str, speed: float, loop_forever: bool):
+    """Serve a recorded landmark stream instead of the camera.
 
-            # Optional preview window
-            if show_preview:
-                preview_frame = draw_landmarks(frame.copy(), result)
+    speed scales the original timing (2.0 = twice as fast); 0 sends frames
+    as fast as clients can take them. Frame times keep counting up across
+    loops, one average frame interval after the previous pass, so gesture
+    holds and smoothing never see time run backwards.
+    """
+    global should_exit
 
-                # Add status text
-                status = f"Hands: {data['num_hands']} | Clients: {len(connected_clients)}"
-                cv2.putText(
-                    preview_frame, status, (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2
-                )
+    records = load_recording(path)
+    if not len(records):
+        print(f"Recording {path} is empty")
+        should_exit = True
+        return
+
+    duration = float(records["time"][-1])
+    # From the first frame of a pass to the first of the next: the span plus one average interval
+    span = duration - float(records["time"][0])
+    pass_length = span + (span / (len(records) - 1) if len(records) > 1 else 0.0)
+    print(f"Replaying {len(records)} frames ({duration:.1f}s) from {path} at {speed or 'max'}x")
+
+    # Start on the first client so repros see the stream from frame one
+    while not connected_clients and not should_exit:
+        await asyncio.sleep(0.01)
 
-                # Show gestures
-                left_g = data['gestures']['left']
-                right_g = data['gestures']['right']
-                gesture_text = f"L: {left_g} | R: {right_g}"
-                cv2.putText(
-                    preview_frame, gesture_text, (10, 60),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2
+    loop = asyncio.get_running_loop()
+    frame_count = 0
+    start = loop.time()
+    offset = 0.0  # Recording time at which the current pass started
+
+    while not should_exit:
+        for record in records:
+            if should_exit:
+                break
+            frame_time = offset + float(record["time"])
+            if speed > 0:
+                delay = start + frame_time / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+
+            frame_count += 1
+            frame = record_to_frame(record, frame_count)
+            # A replayed frame is "captured" when it is published
+            published_at = time.monotonic()
+            if embed_timings:
+                frame.timings = {"captured_at": round(published_at, 6)}
+            publish_frame(frame, published_at, frame_time=frame_time)
+            metrics.frame_done()
+
+        if not loop_forever:
+            break
+        offset += pass_length
+
+    print(f"Replay finished after {frame_count} frames")
+
+
+async def capture_and_process(open_source: Callable, show_preview: bool, running_mode: str = "image",
+                              recorder: Optional[LandmarkRecorder] = None, roi: Optional[RoiTracker] = None,
+                              workers: int = 1, pool_order: str = "ordered", preview_fps: float = 15.0):
+    """Main capture loop.
+
+    open_source() opens the frame source (see open_frame_source); it runs on
+    a worker thread. A finite source that runs out ends the loop.
+
+    With a RoiTracker, inference runs on a crop around the last detected hands
+    (see roi.py) and landmarks are remapped to full-frame coordinates here;
+    not with an in-process LIVE_STREAM recognizer, which tracks across frames.
+    With workers > 1, frames go to an InferencePool of that many processes.
+    """
+    global should_exit
+
+    loop = asyncio.get_running_loop()
+    if running_mode == "live_stream" or workers > 1:
+        live_stream = LiveStreamResults(loop, keep_frames=show_preview)
+    else:
+        live_stream = None
+    predictor = MotionPredictor() if scheduler else None
+    if scheduler and live_stream:
+        print("Frame skipping needs --running-mode image and one worker; inferring every frame")
+        predictor = None
+    if roi and running_mode == "live_stream" and workers == 1:
+        # LIVE_STREAM tracks hands from the previous frame's region, which a
+        # different crop every frame (and full-frame searches) would break
+        print("ROI inference needs --running-mode image or --workers > 1; inferring on full frames")
+        roi = None
+
+    # Open the frame source and load (and warm up) the model at the same time,
+    # off the event loop, while the server already answers clients. Pool
+    # workers load their own models once the source has told us the frame size.
+    if workers > 1:
+        model_loader = download_model
+    else:
+        model_loader = functools.partial(load_recognizer, live_stream)
+    cap, model = await asyncio.gather(
+        loop.run_in_executor(None, open_source),
+        loop.run_in_executor(None, model_loader)
+    )
+
+    if cap is None or not model:
+        if cap is not None:
+            print("Cannot proceed without model file.")
+            cap.release()
+        if workers == 1 and model:
+            model.close()
+        should_exit = True
+        return
+
+    print(f"Frame source: {cap}")
+
+    pool = None
+    recognizer = None
+    if workers > 1:
+        if running_mode == "live_stream":
+            print("Pool workers run IMAGE mode recognizers; ignoring --running-mode live_stream")
+        print(f"Starting {workers} inference workers ({pool_order})...")
+        width, height = cap.frame_size
+        frame_shape = (height, width, 3)
+        pool = await loop.run_in_executor(None, start_inference_pool, workers, pool_order, frame_shape, live_stream)
+        if pool is None:
+            should_exit = True
+            cap.release()
+            return
+    else:
+        recognizer = model
+    recognizer_hands = 2  # Lowered by the quality controller, see replace_recognizer
+
+    # Camera reads happen on their own thread; inference on a single worker
+    # (the recognizer is not thread-safe) so the event loop never blocks.
+    grabber = FrameGrabber(cap, lossless=not cap.realtime)
+    grabber.start()
+    inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    frame_count = 0
+    feeder = None
+    preview = None
+    if show_preview:
+        preview = PreviewWindow(preview_fps)
+        preview.start()
+
+    try:
+        if pool:
+            feeder = asyncio.create_task(feed_pool(live_stream, pool, grabber, inference_executor, roi))
+        elif live_stream:
+            feeder = asyncio.create_task(
+                feed_live_stream(live_stream, grabber, recognizer, inference_executor, roi)
+            )
+
+        last_seq = 0
+        while not should_exit:
+            # No fixed pacing: results are published as soon as they exist
+            if live_stream:
+                frame, result, timings, region = await live_stream.next_result(timeout=0.1)
+            elif predictor:
+                last_seq, frame, result, timings, region = await loop.run_in_executor(
+                    inference_executor, infer_or_skip_frame, grabber, recognizer, last_seq, predictor, roi
+                )
+            else:
+                last_seq, frame, result, timings, region = await loop.run_in_executor(
+                    inference_executor, infer_latest_frame, grabber, recognizer, last_seq, roi
                 )
 
-                # Show detected gesture
-                if data['two_open_palms']:
-                    cv2.putText(
-                        preview_frame, "CATCH! (2 palms)", (10, 100),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 3
-                    )
-                elif left_g == "Open_Palm" or right_g == "Open_Palm":
-                    cv2.putText(
-                        preview_frame, "1 HAND PASS", (10, 100),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3
-                    )
-
-                cv2.imshow("Hand Tracking", preview_frame)
-
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    should_exit = True
-                    break
+            if result is not None:
+                # Convert the result to arrays once (pool workers already did);
+                # everything below reads them
+                mirrored = not capture_buffers.skip_flip
+                hand_frame = result if pool else HandFrame.from_result(result, mirrored)
+                if roi:
+                    remap_to_frame(hand_frame, region)
+                    roi.update(hand_frame)
+                if predictor:
+                    predictor.update(hand_frame, timings["captured"])
+            elif predictor and timings:
+                # Skipped by the scheduler: extrapolate from the last inference
+                hand_frame = predictor.predict(timings["captured"], frame_count + 1)
+                mirrored = False  # Raw camera frame, never converted
+            elif grabber.finished:
+                print(f"Frame source finished after {cap.frames_read} frames")
+                break
+            else:
+                continue
 
-            # Limit to ~30fps
-            await asyncio.sleep(1/30)
+            frame_count += 1
+            hand_frame.timestamp = frame_count
+            captured_at = timings["captured"] if timings else None
+            ready_at = time.monotonic()
+            if timings and not hand_frame.predicted:
+                record_stage_timings(timings)
+                ready_at = timings["inferred"]
+                if embed_timings:
+                    hand_frame.timings = stage_timings_ms(timings)
+            if recorder:
+                recorder.write(hand_frame, captured_at or time.monotonic())
+
+            if frame_count == 1:
+                mark_startup("first_frame")
+                set_tracker_status("ready")
+            if hand_frame.num_hands and "first_landmarks" not in startup_times:
+                mark_startup("first_landmarks")
+
+            # Broadcast to connected clients
+            publish_frame(hand_frame, captured_at)
+            published_at = time.monotonic()
+            metrics.record("serialize", published_at - ready_at)
+            metrics.frame_done()
+
+            if quality and timings and not hand_frame.predicted:
+                change = quality.observe(published_at - captured_at, published_at)
+                if change:
+                    apply_quality_change(change)
+                    num_hands = quality.current["num_hands"]
+                    if recognizer and num_hands != recognizer_hands:
+                        recognizer = await loop.run_in_executor(
+                            inference_executor, replace_recognizer, recognizer, num_hands
+                        )
+                        recognizer_hands = num_hands
+
+            # Optional preview window, drawn on its own thread
+            if preview:
+                preview.submit(frame, hand_frame, mirrored)
 
     finally:
-        recognizer.close()
+        if feeder:
+            feeder.cancel()
+        grabber.stop()
+        if pool:
+            # Unblocks a feeder waiting for a free slot before the executor joins it
+            pool.close()
+            if pool.dropped:
+                print(f"Inference pool: {pool.dropped} results older than a delivered one were dropped")
+        inference_executor.shutdown(wait=True)
+        if recognizer:
+            recognizer.close()
         cap.release()
-        if show_preview:
-            cv2.destroyAllWindows()
+        if roi:
+            print(f"ROI inference: {roi.crops} cropped frames, {roi.searches} full-frame searches")
+        if predictor:
+            stats = scheduler.stats()
+            print(f"Frame skipping: {stats['inferred']} inferred, {stats['predicted']} predicted "
+                  f"(last interval {stats['interval']})")
+        if preview:
+            preview.stop()
 
 
-async def main(port: int, camera_index: int, show_preview: bool):
+async def main(args: argparse.Namespace):
     """Main entry point."""
-    global should_exit
+    global should_exit, change_detector, client_queue_size, drop_policy, send_buffer_size, embed_timings, smoother
+    global gesture_hold_times, gesture_release_grace, scheduler, capture_buffers, quality, backend
+    global model_cache, model_choice, accuracy_floor, model_sample, remeasure_models
 
     print(f"Starting Hand Tracking Bridge...")
-    print(f"WebSocket server on ws://127.0.0.1:{port}")
-    print(f"Using camera index: {camera_index}")
+    print(f"WebSocket server on ws://127.0.0.1:{args.port}")
+    if args.replay:
+        print(f"Replaying recording: {args.replay}")
+    else:
+        print(f"Frame source: {args.source or f'camera {args.camera}'}"
+              f"{' (as fast as possible)' if args.fast else ''}")
+        print(f"Running mode: {args.running_mode}")
+        if args.model == "auto":
+            print(f"Model: fastest installed variant with accuracy >= {args.accuracy_floor:g}")
+        elif args.model:
+            print(f"Model: {args.model}")
+        elif args.backend != "gesture_recognizer":
+            print("Backend: HandLandmarker with geometric gesture classification")
+        if args.workers > 1:
+            print(f"Inference pool: {args.workers} worker processes, {args.pool_order} results")
+        if args.roi and (args.running_mode == "image" or args.workers > 1):
+            print(f"ROI inference: crops up to {args.roi_size}px, searches at {args.search_size}px")
+        if args.infer_every != 1:
+            interval = args.infer_every or f"auto (budget {args.inference_budget:.0%})"
+            print(f"Inference interval: {interval}, predicting frames in between")
+        if args.latency_budget:
+            print(f"Adaptive quality: {args.latency_budget:g} ms latency budget")
+    if args.smoothing != "off":
+        print(f"Landmark smoothing: {args.smoothing}")
+    if args.send_on_change:
+        print(f"Change-driven sending (epsilon {args.change_epsilon}, heartbeat {args.heartbeat_interval}s)")
+    send_buffer = f"{args.send_buffer} byte send buffers" if args.send_buffer else "OS default send buffers"
+    print(f"Client queues: {args.client_queue_size} frames, {args.drop_policy}, {send_buffer}")
     print("Press Ctrl+C to stop (or 'q' in preview window)\n")
 
+    client_queue_size = args.client_queue_size
+    drop_policy = args.drop_policy
+    send_buffer_size = args.send_buffer
+    embed_timings = args.embed_timings
+    smoother = create_smoother(args.smoothing, args.min_cutoff, args.beta, args.d_cutoff, args.ema_alpha)
+    gesture_hold_times = parse_hold_times(args.hold_time)
+    gesture_release_grace = args.release_grace
+    backend = VARIANTS[args.model].backend if args.model in VARIANTS else args.backend
+    model_cache = ModelCache(args.model_dir, allow_download=not args.no_download)
+    model_choice = args.model
+    accuracy_floor = args.accuracy_floor
+    model_sample = args.model_sample
+    remeasure_models = args.remeasure_models
+    capture_buffers = CaptureBuffers(args.skip_flip)
+    if args.infer_every != 1:
+        scheduler = InferenceScheduler(args.infer_every, args.inference_budget, args.max_infer_every)
+    if args.latency_budget and not args.replay:
+        # Resolution works in every mode; the inference interval and num_hands
+        # only with the single in-process IMAGE mode recognizer, and the
+        # interval only if --infer-every was left to the controller
+        knobs = ["scale"]
+        if args.running_mode == "image" and args.workers == 1:
+            knobs.append("num_hands")
+            if args.infer_every == 1:
+                knobs.append("infer_every")
+                scheduler = InferenceScheduler(1)
+        quality = QualityController(args.latency_budget / 1000, knobs, args.quality_headroom,
+                                    args.quality_down_after, args.quality_up_after)
+
     # Start WebSocket server
     server = await websockets.serve(
         websocket_handler,
         "127.0.0.1",
-        port
+        args.port,
+        select_subprotocol=select_subprotocol,
+        process_request=process_http_request,
+        write_limit=0,  # send() waits until the socket took the frame; see ClientSender
+        compression=None  # Deflated frames would fit the send buffer by the dozen
     )
 
-    print(f"WebSocket server running on port {port}")
+    print(f"WebSocket server running on port {args.port}")
+    mark_startup("server_listening")
+    print(f"Metrics at http://127.0.0.1:{args.port}/metrics")
+    transport_servers = []
+    if "udp" in args.transport:
+        udp_port = args.udp_port or args.port
+        transport_servers.append(await serve_udp(websocket_handler, "127.0.0.1", udp_port, args.udp_timeout))
+        print(f"UDP transport on port {udp_port}")
+    if "unix" in args.transport:
+        try:
+            transport_servers.append(await serve_unix(websocket_handler, args.unix_socket))
+        except OSError as e:
+            print(f"Error: Unix socket transport: {e}")
+            for transport_server in [server, *transport_servers]:
+                transport_server.close()
+            return
+        print(f"Unix socket transport at {args.unix_socket}")
+
+    metrics_task = asyncio.create_task(send_subscribed_metrics())
+    heartbeat_task = None
+    if args.send_on_change:
+        change_detector = ChangeDetector(args.change_epsilon, args.heartbeat_interval)
+        heartbeat_task = asyncio.create_task(send_heartbeats(change_detector))
+
+    recorder = None
+    if args.record and not args.replay:
+        recorder = LandmarkRecorder(args.record, time.monotonic())
+        print(f"Recording landmarks to {args.record}")
 
     # Run capture loop
     try:
-        await capture_and_process(camera_index, show_preview)
+        if args.replay:
+            set_tracker_status("ready")
+            await replay_recording(args.replay, args.replay_speed, args.replay_loop)
+        else:
+            roi = RoiTracker(args.roi_margin, roi_size=args.roi_size, search_size=args.search_size,
+                             refresh_interval=args.roi_refresh) if args.roi else None
+            open_source = functools.partial(
+                open_frame_source, args.source or f"camera:{args.camera}", not args.fast, args.loop_source,
+                args.width, args.height, args.fps, args.camera_profile
+            )
+            await capture_and_process(open_source, args.show_preview, args.running_mode, recorder, roi,
+                                      args.workers, args.pool_order, args.preview_fps)
     except KeyboardInterrupt:
         pass
     finally:
         should_exit = True
-        server.close()
-        await server.wait_closed()
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.frames} frames to {args.record}")
+        if heartbeat_task:
+            heartbeat_task.cancel()
+        metrics_task.cancel()
+        for transport_server in [server, *transport_servers]:
+            transport_server.close()
+            await transport_server.wait_closed()
         print("Server stopped")
 
 
-if __name__ == "__main__":
+def inference_interval(value: str) -> int:
+    """--infer-every value: a positive frame interval, or "auto" (0)."""
+    if value == "auto":
+        return 0
+    interval = int(value)
+    if interval < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer or 'auto'")
+    return interval
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="MediaPipe Hand Tracking Bridge")
     parser.add_argument("--port", type=int, default=8765, help="WebSocket port (default: 8765)")
+    parser.add_argument("--transport", action="append", choices=TRANSPORTS, default=[],
+                        help="Also serve clients over UDP datagrams or a Unix domain socket; repeatable")
+    parser.add_argument("--udp-port", type=int, help="UDP transport port (default: same as --port)")
+    parser.add_argument("--udp-timeout", type=float, default=5.0,
+                        help="Drop UDP clients silent for this many seconds (default: 5)")
+    parser.add_argument("--unix-socket", default="/tmp/hand_tracker.sock",
+                        help="Unix transport socket path (default: /tmp/hand_tracker.sock)")
     parser.add_argument("--camera", type=int, default=0, help="Camera index (default: 0)")
+    parser.add_argument("--probe-camera", action="store_true",
+                        help="Measure the capture modes of --camera (backend, pixel format, buffer size, "
+                             "resolution), write the lowest-latency one to --camera-profile and exit")
+    parser.add_argument("--camera-profile", default=CAMERA_PROFILE_PATH,
+                        help="Camera profile written by --probe-camera, applied to the camera if it was probed "
+                             f"for the same --width/--height/--fps (default: {CAMERA_PROFILE_PATH})")
+    parser.add_argument("--probe-seconds", type=float, default=2.0,
+                        help="With --probe-camera, measured seconds per capture mode (default: 2)")
+    parser.add_argument("--source", metavar="SPEC",
+                        help="Frame source instead of --camera: camera:N, video:FILE_OR_GLOB, "
+                             "images:DIR or synthetic:{blank,noise,bars}")
+    parser.add_argument("--fast", action="store_true",
+                        help="Read file/image/synthetic sources as fast as possible, processing every frame "
+                             "(default: real time)")
+    parser.add_argument("--loop-source", action="store_true", help="Restart a file or image source when it ends")
+    parser.add_argument("--width", type=int, default=640, help="Camera/synthetic frame width (default: 640)")
+    parser.add_argument("--height", type=int, default=480, help="Camera/synthetic frame height (default: 480)")
+    parser.add_argument("--fps", type=float, default=30,
+                        help="Camera/synthetic frame rate, and image directory pacing (default: 30)")
     parser.add_argument("--show-preview", action="store_true", help="Show camera preview window")
+    parser.add_argument("--preview-fps", type=float, default=15.0,
+                        help="Max preview window refresh rate; 0 = every tracked frame (default: 15)")
+    parser.add_argument("--running-mode", choices=["image", "live_stream"], default="image",
+                        help="MediaPipe running mode: synchronous IMAGE or callback-driven LIVE_STREAM (default: image)")
+    parser.add_argument("--backend", choices=BACKENDS, default="gesture_recognizer",
+                        help="gesture_recognizer: MediaPipe's gesture classifier; landmarker: HandLandmarker "
+                             "plus geometric finger-extension gestures (default: gesture_recognizer)")
+    parser.add_argument("--model", metavar="VARIANT|auto",
+                        help="Model variant to run (see python models.py list; sets the backend), or auto: "
+                             "the fastest installed variant meeting --accuracy-floor (default: the backend's)")
+    parser.add_argument("--model-dir", default=model_cache.directory,
+                        help=f"Model cache directory (default: {model_cache.directory})")
+    parser.add_argument("--model-registry", metavar="FILE",
+                        help="JSON file with more model variants, or checksums and accuracy for built-in ones")
+    parser.add_argument("--no-download", action="store_true",
+                        help="Never download models; use only variants provisioned in --model-dir")
+    parser.add_argument("--accuracy-floor", type=float, default=DEFAULT_ACCURACY_FLOOR,
+                        help=f"With --model auto, lowest accuracy a variant may have (default: {DEFAULT_ACCURACY_FLOOR})")
+    parser.add_argument("--model-sample", metavar="SPEC",
+                        help="With --model auto, frame source with hands in it to time the variants on, e.g. "
+                             "video:clip.mp4; needed unless stored timings or a single variant decide")
+    parser.add_argument("--remeasure-models", action="store_true",
+                        help="With --model auto, time the variants again instead of reusing stored timings")
+    parser.add_argument("--skip-flip", action="store_true",
+                        help="Run inference on the unmirrored camera frame and mirror the landmarks instead")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Inference worker processes, each with its own recognizer (default: 1, in-process)")
+    parser.add_argument("--pool-order", choices=ORDERS, default="ordered",
+                        help="With --workers > 1: deliver results in frame order, or newest-first "
+                             "dropping stale ones (default: ordered)")
+    parser.add_argument("--roi", action="store_true",
+                        help="Run inference on a crop around the last detected hands (full-frame search when lost); "
+                             "image running mode or --workers > 1 only")
+    parser.add_argument("--roi-margin", type=float, default=0.5,
+                        help="Crop margin around the hands, as a fraction of their box size (default: 0.5)")
+    parser.add_argument("--roi-size", type=int, default=256,
+                        help="Longest side in pixels a crop is downscaled to before inference (default: 256)")
+    parser.add_argument("--search-size", type=int, default=320,
+                        help="Longest side in pixels of the full-frame search image (default: 320)")
+    parser.add_argument("--roi-refresh", type=int, default=30,
+                        help="Do a full-frame search every N frames to pick up new hands (default: 30)")
+    parser.add_argument("--infer-every", type=inference_interval, default=1, metavar="N|auto",
+                        help="Run inference on every Nth frame and predict the others; "
+                             "auto adapts N to the measured inference time (default: 1)")
+    parser.add_argument("--inference-budget", type=float, default=0.5,
+                        help="With --infer-every auto, fraction of the camera frame time "
+                             "inference may use on average (default: 0.5)")
+    parser.add_argument("--max-infer-every", type=int, default=6,
+                        help="Upper bound for the automatic inference interval (default: 6)")
+    parser.add_argument("--latency-budget", type=float, default=0, metavar="MS",
+                        help="Lower inference resolution, rate and num_hands while capture-to-send latency "
+                             "is over this many milliseconds, and raise them again when it recovers (default: off)")
+    parser.add_argument("--quality-headroom", type=float, default=0.6,
+                        help="Step quality back up below this fraction of the latency budget (default: 0.6)")
+    parser.add_argument("--quality-down-after", type=float, default=1.0,
+                        help="Seconds over budget before stepping quality down (default: 1)")
+    parser.add_argument("--quality-up-after", type=float, default=5.0,
+                        help="Seconds under the headroom before stepping quality up (default: 5)")
+    parser.add_argument("--send-on-change", action="store_true",
+                        help="Only send frames that changed, plus tracking events and heartbeats")
+    parser.add_argument("--change-epsilon", type=float, default=0.005,
+                        help="Min normalized landmark movement that counts as a change (default: 0.005)")
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0,
+                        help="Seconds between heartbeats while nothing changes (default: 1.0)")
+    parser.add_argument("--client-queue-size", type=int, default=4,
+                        help="Frames buffered per client before dropping (default: 4)")
+    parser.add_argument("--drop-policy", choices=["drop-oldest", "latest"], default="drop-oldest",
+                        help="What a full client queue drops: the oldest frame, or all but the latest (default: drop-oldest)")
+    parser.add_argument("--send-buffer", type=int, default=4096,
+                        help="Kernel send buffer per client in bytes, so that frames a slow client cannot take "
+                             "wait in its queue where they can be dropped; 0 keeps the OS default (default: 4096)")
+    parser.add_argument("--embed-timings", action="store_true",
+                        help="Include per-stage latencies and the capture time in each JSON frame")
+    parser.add_argument("--smoothing", choices=["off", "one-euro", "ema"], default="off",
+                        help="Server-side landmark smoothing filter (default: off)")
+    parser.add_argument("--min-cutoff", type=float, default=1.0,
+                        help="One Euro minimum cutoff in Hz; lower = smoother when still (default: 1.0)")
+    parser.add_argument("--beta", type=float, default=5.0,
+                        help="One Euro speed coefficient; higher = less lag when moving (default: 5.0)")
+    parser.add_argument("--d-cutoff", type=float, default=1.0,
+                        help="One Euro cutoff for the speed estimate in Hz (default: 1.0)")
+    parser.add_argument("--ema-alpha", type=float, default=0.5,
+                        help="EMA weight of the newest sample, 0-1 (default: 0.5)")
+    parser.add_argument("--hold-time", action="append", metavar="GESTURE=SECONDS",
+                        help="Hold time for server-side gesture events, e.g. CATCH=0.7 (default: 0.5 each)")
+    parser.add_argument("--release-grace", type=float, default=0.15,
+                        help="Seconds a held gesture may drop out before its hold restarts (default: 0.15)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Record the landmark/gesture stream to FILE for later --replay")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="Serve a recorded stream instead of the camera (no MediaPipe needed)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay speed multiplier; 0 = as fast as possible (default: 1.0)")
+    parser.add_argument("--replay-loop", action="store_true", help="Restart the replay when it ends")
+    return parser
+
 
+if __name__ == "__main__":
+    parser = build_arg_parser()
     args = parser.parse_args()
+    if args.model_registry:
+        try:
+            load_registry(args.model_registry)
+        except (OSError, ValueError, TypeError) as e:
+            parser.error(f"--model-registry: {e}")
+    if "unix" in args.transport and not UNIX_SOCKETS_SUPPORTED:
+        parser.error("--transport unix: Unix domain sockets are not supported on this platform")
+    if args.model not in (None, "auto", *VARIANTS):
+        parser.error(f"--model: unknown variant {args.model!r}; known: auto, {', '.join(VARIANTS)}")
+
+    if args.probe_camera:
+        load_opencv()
+        import camera_probe
+
+        sys.exit(0 if camera_probe.run_probe(args.camera, args.width, args.height, args.fps,
+                                             args.camera_profile, args.probe_seconds) else 1)
 
     signal.signal(signal.SIGINT, signal_handler)
 
     try:
-        asyncio.run(main(args.port, args.camera, args.show_preview))
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         print("\nStopped by user")
         sys.exit(0)
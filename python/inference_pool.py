@@ -0,0 +1,215 @@
+"""
+Multi-process inference: K worker processes, each with its own recognizer.
+
+One GestureRecognizer on one thread caps throughput at roughly one core. The
+pool keeps a ring of frame slots in a single shared memory block; the capture
+side copies each mirrored BGR frame into a free slot and sends only
+(seq, slot, height, width) to the workers, which convert and infer straight
+from shared memory and return a HandFrame (a few hundred bytes).
+
+A collector thread puts results back in order before handing them on:
+"ordered" delivers every frame in capture order (a slow frame holds back
+the ones after it), "newest" delivers each result as soon as it arrives and
+drops any that are older than one already delivered.
+
+Workers ignore SIGINT; the parent shuts them down. A worker that dies later
+fails the whole pool (see InferencePool.error): the frame it held can never
+be delivered, and "ordered" would wait for it forever.
+"""
+
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+import numpy as np
+
+from hand_frame import HandFrame
+
+ORDERS = ["ordered", "newest"]
+
+
+def _worker_main(recognizer_factory: Callable, shm_name: str, slot_shape: tuple, num_slots: int,
+                 mirrored: bool, tasks, results):
+    """Worker process loop: infer frames from shared memory until a None task."""
+    # Ctrl+C reaches the whole process group; the parent closes the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import cv2
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((num_slots, *slot_shape), dtype=np.uint8, buffer=shm.buf)
+    recognizer = recognizer_factory()
+    results.put(("ready", None, None, None, None))
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, height, width = task
+            started = time.monotonic()
+            try:
+                rgb_frame = cv2.cvtColor(slots[slot, :height, :width], cv2.COLOR_BGR2RGB)
+                result = recognizer.recognize(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame))
+                frame = HandFrame.from_result(result, mirrored)
+            except Exception as e:
+                print(f"Inference worker error on frame {seq}: {e}")
+                frame = None
+            results.put((seq, slot, frame, started, time.monotonic()))
+    finally:
+        recognizer.close()
+        del slots
+        shm.close()
+
+
+class InferencePool:
+    """Runs recognizer_factory() recognizers in worker processes.
+
+    submit() blocks while every slot is in flight, which keeps the capture side
+    from queueing more than the workers can take (the FrameGrabber drops the
+    frames that arrive meanwhile). on_result(context, frame, started,
+    finished) is called from the collector thread, in the configured order;
+    frame is None if that frame's inference failed. mirrored=False tells the
+    workers their frames were not flipped (see HandFrame.from_result).
+
+    If a worker exits while the pool runs, error says which, and submit()
+    returns False from then on.
+    """
+
+    def __init__(self, workers: int, recognizer_factory: Callable, frame_shape: tuple, on_result: Callable,
+                 order: str = "ordered", slots_per_worker: int = 2, mirrored: bool = True):
+        if order not in ORDERS:
+            raise ValueError(f"Unknown result order: {order}")
+        self.workers = workers
+        self.order = order
+        self.dropped = 0
+        self._on_result = on_result
+        self._slot_shape = tuple(frame_shape)
+        self._num_slots = workers * slots_per_worker
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self._num_slots * int(np.prod(self._slot_shape))
+        )
+        self._slots = np.ndarray((self._num_slots, *self._slot_shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._free_slots = queue.SimpleQueue()
+        self._lock = threading.Lock()  # Guards the shared memory against close() mid-copy
+        self._closing = False
+        self.error: Optional[str] = None
+        for slot in range(self._num_slots):
+            self._free_slots.put(slot)
+
+        self._next_seq = 0
+        self._next_out = 0  # ordered: next seq to deliver; newest: oldest seq still deliverable
+        self._contexts: dict = {}
+        self._finished: dict = {}
+
+        # spawn: MediaPipe and OpenCV do not survive fork() with threads running
+        ctx = multiprocessing.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._processes = [
+            ctx.Process(
+                target=_worker_main, name=f"inference-{i}", daemon=True,
+                args=(recognizer_factory, self._shm.name, self._slot_shape, self._num_slots,
+                      mirrored, self._tasks, self._results)
+            )
+            for i in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, name="inference-collector", daemon=True)
+
+    def wait_ready(self, timeout: float = 120.0):
+        """Block until every worker has loaded its model, then start collecting.
+
+        Raises RuntimeError if a worker dies or does not get ready in time.
+        """
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < len(self._processes):
+            try:
+                self._results.get(timeout=0.5)
+                ready += 1
+            except queue.Empty:
+                if any(process.exitcode is not None for process in self._processes):
+                    raise RuntimeError("An inference worker exited during startup")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Inference workers not ready after {timeout:.0f}s")
+        self._collector.start()
+
+    def submit(self, image: np.ndarray, context) -> bool:
+        """Copy a BGR image into a free slot and queue it.
+
+        Returns False if the image does not fit a slot or the pool is closing.
+        """
+        height, width = image.shape[:2]
+        if height > self._slot_shape[0] or width > self._slot_shape[1]:
+            return False
+
+        slot = None
+        while slot is None and not self._closing:
+            try:
+                slot = self._free_slots.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+        with self._lock:
+            if self._closing:
+                return False
+            np.copyto(self._slots[slot, :height, :width], image)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._contexts[seq] = context
+            self._tasks.put((seq, slot, height, width))
+        return True
+
+    def _collect(self):
+        while True:
+            # Checked on every pass: the other workers may keep the queue busy
+            dead = next((process for process in self._processes if process.exitcode is not None), None)
+            if dead and not self._closing:
+                with self._lock:
+                    self._closing = True
+                    self.error = f"Inference worker {dead.name} exited with code {dead.exitcode}"
+                return
+            try:
+                item = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            seq, slot, frame, started, finished = item
+            self._free_slots.put(slot)
+            context = self._contexts.pop(seq)
+
+            if self.order == "newest":
+                if seq < self._next_out:
+                    self.dropped += 1  # A newer frame was already delivered
+                    continue
+                self._next_out = seq + 1
+                self._on_result(context, frame, started, finished)
+                continue
+
+            self._finished[seq] = (context, frame, started, finished)
+            while self._next_out in self._finished:
+                self._on_result(*self._finished.pop(self._next_out))
+                self._next_out += 1
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        if self._collector.is_alive():
+            self._results.put(None)
+            self._collector.join(timeout=1.0)
+        del self._slots
+        self._shm.close()
+        self._shm.unlink()
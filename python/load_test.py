@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+WebSocket fan-out load test for hand_tracker.py.
+
+Starts the tracker in replay or synthetic-source mode (or attaches to one
+already running), then opens growing numbers of simulated clients and
+reports, per client count, what the well-behaved clients see:
+
+    normal   read every message as fast as it arrives
+    slow     take slow_delay seconds to handle each message
+    stalled  connect and never read, so their TCP buffers and queues fill
+    churn    connect, send junk, read a few messages, disconnect, repeat
+
+Delivery latency is measured client-side from the captured_at time the
+tracker embeds with --embed-timings (same host, same monotonic clock).
+Drops are the tracker's own per-client counts from /metrics; "missed" are
+frame timestamps a client never saw. Tracker CPU comes from /proc, so
+attaching to a running tracker needs --pid for it; without /proc (Windows,
+macOS) it is not reported. The load generator's
+own CPU is reported too: on a small box it can become the bottleneck.
+
+A slow client's latency is mostly the frames buffered on its own side: the
+tracker only queues (and drops) what the client's kernel receive buffer and
+WebSocket library queue cannot take, and on loopback the receive buffer
+grows to hold seconds of frames. --client-buffer and --client-queue bound
+those two, as a latency-sensitive client would.
+
+Usage:
+    python load_test.py --replay session.htrec --clients 1 10 50 100 200 400
+    python load_test.py --source synthetic:noise --clients 10 100 --slow 0.1 --stalled 0.05
+    python load_test.py --replay session.htrec --clients 10 --slow 1 --client-buffer 4096 --client-queue 1
+    python load_test.py --attach 8765 --pid 12345 --json capacity.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Optional
+
+import websockets
+
+from metrics import LatencyHistogram
+
+BEHAVIORS = ["normal", "slow", "stalled", "churn"]
+
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of a process, from /proc/<pid>/stat; None without /proc."""
+    if not hasattr(os, "sysconf"):  # Windows
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def fetch_metrics(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        return json.load(response)
+
+
+class ClientGroup:
+    """Counters shared by all clients of one behavior during a step."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram(1_000_000)
+        self.frames = 0
+        self.missed = 0
+        self.errors = 0
+        self.connects = 0
+
+    def summary(self, clients: int, duration: float) -> dict:
+        seen = self.frames + self.missed
+        return {
+            "clients": clients,
+            "fps_per_client": round(self.frames / duration / clients, 2) if clients else 0.0,
+            "missed_percent": round(100.0 * self.missed / seen, 2) if seen else 0.0,
+            "errors": self.errors,
+            "connects": self.connects,
+            "latency": self.latency.summary()
+        }
+
+
+class LoadClient:
+    def __init__(self, port: int, behavior: str, group: ClientGroup, slow_delay: float,
+                 receive_buffer: int = 0, max_queue: int = 16):
+        self.port = port
+        self.behavior = behavior
+        self.group = group
+        self.slow_delay = slow_delay
+        self.receive_buffer = receive_buffer  # SO_RCVBUF in bytes, 0: the OS default
+        self.max_queue = max_queue  # Messages the websockets client buffers
+        self.recording = False  # Counters only run during the measured window
+        self.local_ports: set = set()
+
+    async def run(self):
+        while True:
+            try:
+                sock = await self._connect_socket()
+                async with websockets.connect(f"ws://127.0.0.1:{self.port}", sock=sock,
+                                              max_queue=self.max_queue) as ws:
+                    self.group.connects += 1
+                    self.local_ports.add(ws.local_address[1])
+                    if self.behavior == "stalled":
+                        await asyncio.Future()  # Never read
+                    elif self.behavior == "churn":
+                        await self._churn(ws)
+                        continue
+                    await self._read(ws)
+            except (OSError, websockets.exceptions.WebSocketException):
+                if self.recording:
+                    self.group.errors += 1
+                await asyncio.sleep(0.5)
+
+    async def _connect_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        if self.receive_buffer:
+            # Before connecting, so that the advertised window honours it
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+        try:
+            await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", self.port))
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    async def _read(self, ws):
+        last_timestamp = None
+        async for message in ws:
+            now = time.monotonic()
+            data = json.loads(message)
+            if "type" in data:
+                continue
+            if self.recording:
+                self.group.frames += 1
+                if last_timestamp is not None and data["timestamp"] > last_timestamp + 1:
+                    self.group.missed += data["timestamp"] - last_timestamp - 1
+                captured_at = data.get("timings", {}).get("captured_at")
+                if captured_at is not None:
+                    self.group.latency.record(now - captured_at)
+            last_timestamp = data["timestamp"]
+            if self.behavior == "slow":
+                await asyncio.sleep(self.slow_delay)
+
+    async def _churn(self, ws):
+        await ws.send("not json")
+        await ws.send(json.dumps({"type": "no_such_request"}))
+        await ws.send(json.dumps({"type": "subscribe", "fields": ["bogus"]}))
+        for _ in range(3):
+            await ws.recv()
+        await asyncio.sleep(0.1)
+
+
+async def run_step(port: int, counts: dict, warmup: float, duration: float, slow_delay: float,
+                   pid: int = None, receive_buffer: int = 0, max_queue: int = 16) -> dict:
+    """Run one client mix for warmup + duration seconds and collect the results."""
+    groups = {behavior: ClientGroup() for behavior in BEHAVIORS}
+    clients = [
+        LoadClient(port, behavior, groups[behavior], slow_delay, receive_buffer, max_queue)
+        for behavior in BEHAVIORS for _ in range(counts[behavior])
+    ]
+    tasks = [asyncio.create_task(client.run()) for client in clients]
+    try:
+        await asyncio.sleep(warmup)
+        before = await asyncio.to_thread(fetch_metrics, port)
+        tracker_cpu = process_cpu_seconds(pid) if pid else None
+        own_cpu = time.process_time()
+        started = time.monotonic()
+        for client in clients:
+            client.recording = True
+
+        await asyncio.sleep(duration)
+
+        for client in clients:
+            client.recording = False
+        elapsed = time.monotonic() - started
+        own_cpu = time.process_time() - own_cpu
+        if tracker_cpu is not None:
+            cpu_after = process_cpu_seconds(pid)
+            tracker_cpu = cpu_after - tracker_cpu if cpu_after is not None else None
+        after = await asyncio.to_thread(fetch_metrics, port)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # The tracker's per-client drop counters over the measured window, keyed
+    # back to our behaviors by local port
+    behavior_of = {port: client.behavior for client in clients for port in client.local_ports}
+    dropped_before = {stats["address"]: stats["dropped"] for stats in before["clients"]}
+    dropped = dict.fromkeys(BEHAVIORS, 0)
+    for stats in after["clients"]:
+        behavior = behavior_of.get(int(stats["address"].rsplit(":", 1)[1]))
+        if behavior:
+            dropped[behavior] += stats["dropped"] - dropped_before.get(stats["address"], 0)
+
+    return {
+        "clients": sum(counts.values()),
+        "tracker_fps": round((after["frames"] - before["frames"]) / elapsed, 2),
+        "tracker_cpu_percent": round(100.0 * tracker_cpu / elapsed, 1) if tracker_cpu is not None else None,
+        "generator_cpu_percent": round(100.0 * own_cpu / elapsed, 1),
+        "tracker_stages": {stage: after["stages"][stage] for stage in ("serialize", "send", "total")
+                           if stage in after["stages"]},
+        "dropped": dropped,
+        "groups": {behavior: groups[behavior].summary(counts[behavior], elapsed) for behavior in BEHAVIORS}
+    }
+
+
+def client_mix(total: int, slow: float, stalled: float, churn: float) -> dict:
+    counts = {"slow": round(total * slow), "stalled": round(total * stalled), "churn": round(total * churn)}
+    counts["normal"] = max(total - sum(counts.values()), 1)
+    return counts
+
+
+def start_tracker(args) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_tracker.py"),
+               "--port", str(args.port), "--embed-timings"]
+    if args.replay:
+        command += ["--replay", args.replay, "--replay-loop"]
+    else:
+        command += ["--source", args.source, "--loop-source"]
+    command += args.tracker_args
+    log = open(args.tracker_log, "w") if args.tracker_log else subprocess.DEVNULL
+    return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_for_tracker(port: int, tracker: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if tracker and tracker.poll() is not None:
+            raise RuntimeError(f"Tracker exited with code {tracker.returncode}")
+        try:
+            return fetch_metrics(port)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Tracker not answering on port {port} after {timeout:.0f}s")
+
+
+def print_report(results: list):
+    print(f"{'clients':>8}{'fps':>7}{'cli fps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'missed%':>9}"
+          f"{'slow p95':>10}{'dropped n/s/st':>16}{'cpu%':>7}{'gen cpu%':>10}")
+    for step in results:
+        normal, slow = step["groups"]["normal"], step["groups"]["slow"]
+        latency = normal["latency"]
+        dropped = step["dropped"]
+        cpu = step["tracker_cpu_percent"]
+        print(f"{step['clients']:>8}{step['tracker_fps']:>7.1f}{normal['fps_per_client']:>9.1f}"
+              f"{latency.get('p50_ms', 0):>9.2f}{latency.get('p95_ms', 0):>9.2f}{latency.get('p99_ms', 0):>9.2f}"
+              f"{normal['missed_percent']:>9.2f}{slow['latency'].get('p95_ms', 0):>10.1f}"
+              f"{dropped['normal']:>6}/{dropped['slow']}/{dropped['stalled']:<5}"
+              f"{cpu if cpu is not None else '-':>7}{step['generator_cpu_percent']:>10}")
+
+
+async def run_load_test(args, pid: int) -> list:
+    results = []
+    for total in args.clients:
+        counts = client_mix(total, args.slow, args.stalled, args.churn)
+        print(f"Running {total} clients: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+        results.append(await run_step(args.port, counts, args.warmup, args.duration, args.slow_delay, pid,
+                                      args.client_buffer, args.client_queue))
+        await asyncio.sleep(args.cooldown)  # Let the tracker notice the disconnects
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket fan-out load test for hand_tracker.py")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--replay", metavar="FILE", help="Start the tracker replaying this recording")
+    mode.add_argument("--source", metavar="SPEC", help="Start the tracker on this frame source, e.g. synthetic:noise")
+    mode.add_argument("--attach", type=int, metavar="PORT", help="Use a tracker already running with --embed-timings")
+    parser.add_argument("--pid", type=int, help="With --attach: tracker process id, for its CPU usage")
+    parser.add_argument("--port", type=int, default=8799, help="Port for the started tracker (default: 8799)")
+    parser.add_argument("--tracker-args", nargs=argparse.REMAINDER, default=[],
+                        help="Further hand_tracker.py arguments, e.g. --drop-policy latest (must come last)")
+    parser.add_argument("--tracker-log", help="Write the started tracker's output to this file")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50, 100, 200, 400],
+                        help="Client counts to step through (default: 1 10 50 100 200 400)")
+    parser.add_argument("--slow", type=float, default=0.1, help="Fraction of slow clients (default: 0.1)")
+    parser.add_argument("--slow-delay", type=float, default=0.2,
+                        help="Seconds a slow client spends per message (default: 0.2)")
+    parser.add_argument("--client-buffer", type=int, default=0,
+                        help="Kernel receive buffer of each client in bytes (default: 0, the OS default)")
+    parser.add_argument("--client-queue", type=int, default=16,
+                        help="Messages each client's WebSocket library buffers (default: 16, as websockets)")
+    parser.add_argument("--stalled", type=float, default=0.05, help="Fraction of stalled clients (default: 0.05)")
+    parser.add_argument("--churn", type=float, default=0.05,
+                        help="Fraction of reconnecting, junk-sending clients (default: 0.05)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds before measuring each step (default: 2)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per step (default: 10)")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="Seconds between steps (default: 1)")
+    parser.add_argument("--startup-timeout", type=float, default=120.0,
+                        help="Seconds to wait for the tracker to answer (default: 120)")
+    parser.add_argument("--json", help="Write results to this file")
+
+    args = parser.parse_args()
+
+    tracker = None
+    if args.attach:
+        args.port = args.attach
+        pid = args.pid
+    else:
+        tracker = start_tracker(args)
+        pid = tracker.pid
+    try:
+        wait_for_tracker(args.port, tracker, args.startup_timeout)
+        results = asyncio.run(run_load_test(args, pid))
+    finally:
+        if tracker:
+            tracker.send_signal(signal.SIGINT)  # Lets it close its sockets cleanly
+            try:
+                tracker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                tracker.kill()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,82 @@
+"""
+Rolling latency histograms for the hand tracking pipeline.
+
+Each stage keeps its most recent samples (seconds) and reports p50/p95/p99 in
+milliseconds, so a snapshot shows whether the camera, the model or the network
+is the bottleneck on a given machine.
+"""
+
+import collections
+import time
+from typing import Optional
+
+import numpy as np
+
+# Pipeline stages, in the order a frame goes through them
+STAGES = [
+    "frame_age",   # capture -> picked up for processing
+    "convert",     # flip + BGR->RGB
+    "inference",   # recognizer call (or LIVE_STREAM callback delay)
+    "serialize",   # payload build + encoding for all wire formats
+    "send",        # queued -> written to the socket, per client
+    "total",       # capture -> written to the socket
+]
+
+
+class LatencyHistogram:
+    """Fixed-size window of latency samples with percentile summaries."""
+
+    def __init__(self, window: int = 1000):
+        self._samples = collections.deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def summary(self) -> dict:
+        if not self._samples:
+            return {"count": 0}
+        samples_ms = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples)) * 1000.0
+        p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+        return {
+            "count": len(samples_ms),
+            "mean_ms": round(float(samples_ms.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples_ms.max()), 3)
+        }
+
+
+class PipelineMetrics:
+    """Per-stage histograms plus a processed-frame rate."""
+
+    def __init__(self, window: int = 1000):
+        self.stages = {stage: LatencyHistogram(window) for stage in STAGES}
+        self._frame_times = collections.deque(maxlen=window)
+        self.frames = 0
+
+    def record(self, stage: str, seconds: float):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram(self._frame_times.maxlen)
+        histogram.record(seconds)
+
+    def frame_done(self, now: Optional[float] = None):
+        self.frames += 1
+        self._frame_times.append(time.monotonic() if now is None else now)
+
+    def fps(self) -> float:
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "frames": self.frames,
+            "fps": round(self.fps(), 2),
+            "stages": {stage: histogram.summary() for stage, histogram in self.stages.items()}
+        }
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Model variants: a registry of model bundles, a verified local cache, and
+automatic selection of the fastest variant that is accurate enough.
+
+Each ModelVariant names a MediaPipe model bundle, the backend that runs it
+(see hand_tracker.py --backend), where to download it, its SHA-256 and an
+accuracy score: the interaction agreement with the reference
+GestureRecognizer, as measured by benchmark.py --compare-variant. Variants
+without a published checksum are pinned when the cache downloads them from
+their versioned URL (the hash is kept next to the file, in
+NAME.task.sha256) and verified against the pin from then on. A bundle found
+in the cache with neither is refused, never pinned: it may be corrupt or
+substituted. Copy the .sha256 pin along with a bundle provisioned elsewhere.
+Further variants, such as int8 builds, or checksums and
+accuracy scores for the built-in ones, come from a JSON registry file:
+
+    [{"name": "landmarker_int8", "backend": "landmarker", "filename": "hand_landmarker_int8.task",
+      "url": "https://...", "sha256": "...", "accuracy": 0.97}]
+
+Bundles live in one cache directory (default: next to this file, or
+$HAND_TRACKER_MODEL_DIR). Downloads go to a temporary file that replaces
+the bundle only once it is verified. Kiosks provision the cache ahead of
+time and run the tracker with --no-download:
+
+    python models.py provision all --registry variants.json
+    python models.py list
+
+select_variant() is what hand_tracker.py --model auto uses: it times every
+installed variant on the host and picks the fastest one whose accuracy
+meets a floor. The timings are kept in the cache directory per host,
+bundle checksum and sample (the frames timed, which need hands in them to
+run the landmark and gesture stages), so later starts reuse them instead
+of measuring.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import urllib.request
+from typing import Callable, Optional
+
+BACKENDS = ["gesture_recognizer", "landmarker"]
+DEFAULT_CACHE_DIR = os.environ.get("HAND_TRACKER_MODEL_DIR", os.path.dirname(os.path.abspath(__file__)))
+TIMINGS_FILE = "auto_selection.json"
+DEFAULT_ACCURACY_FLOOR = 0.95
+
+
+class ModelError(Exception):
+    """A model variant that is unknown, missing, unverifiable or fails its checksum."""
+
+
+class ModelVariant:
+    def __init__(self, name: str, backend: str, filename: str, url: Optional[str] = None,
+                 sha256: Optional[str] = None, accuracy: Optional[float] = None, description: str = ""):
+        if backend not in BACKENDS:
+            raise ValueError(f"Variant {name}: unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.name = name
+        self.backend = backend
+        self.filename = filename
+        self.url = url
+        self.sha256 = sha256.lower() if sha256 else None
+        self.accuracy = accuracy  # None: not measured, never picked by auto selection
+        self.description = description
+
+
+VARIANTS = {variant.name: variant for variant in [
+    ModelVariant(
+        "gesture_recognizer_f16", "gesture_recognizer", "gesture_recognizer.task",
+        "https://storage.googleapis.com/mediapipe-models/gesture_recognizer/gesture_recognizer/float16/1/"
+        "gesture_recognizer.task",
+        accuracy=1.0, description="GestureRecognizer, float16 (the reference)"
+    ),
+    ModelVariant(
+        "landmarker_f16", "landmarker", "hand_landmarker.task",
+        "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/"
+        "hand_landmarker.task",
+        description="HandLandmarker, float16, with geometric gestures"
+    ),
+]}
+DEFAULT_VARIANTS = {"gesture_recognizer": "gesture_recognizer_f16", "landmarker": "landmarker_f16"}
+
+
+def load_registry(path: str):
+    """Add the variants of a JSON registry file to VARIANTS.
+
+    An entry naming a built-in variant updates only the fields it gives,
+    e.g. a checksum or a measured accuracy.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    for entry in entries:
+        name = entry.get("name")
+        if not name:
+            raise ValueError(f"{path}: registry entry without a name")
+        if name in VARIANTS:
+            current = VARIANTS[name]
+            entry = {**vars(current), **entry}
+        VARIANTS[name] = ModelVariant(**entry)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """The local directory model bundles are provisioned into and loaded from."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, allow_download: bool = True):
+        self.directory = directory
+        self.allow_download = allow_download
+        self._verified: dict = {}  # path -> (size, mtime) it was verified at
+
+    def path(self, variant: ModelVariant) -> str:
+        return os.path.join(self.directory, variant.filename)
+
+    def expected_sha256(self, variant: ModelVariant) -> Optional[str]:
+        """The registry checksum, else the one pinned at first download."""
+        if variant.sha256:
+            return variant.sha256
+        try:
+            with open(self.path(variant) + ".sha256") as f:
+                return f.read().split()[0].lower()
+        except (OSError, IndexError):
+            return None
+
+    def verify(self, variant: ModelVariant, path: Optional[str] = None, pin: bool = False):
+        """Check a bundle against its checksum.
+
+        A bundle without one is only pinned with pin=True, for a file just
+        downloaded from the variant's URL.
+        """
+        path = path or self.path(variant)
+        stat = os.stat(path)
+        if self._verified.get(path) == (stat.st_size, stat.st_mtime):
+            return
+        actual = file_sha256(path)
+        expected = self.expected_sha256(variant)
+        if expected is None:
+            if not pin:
+                raise ModelError(f"{variant.name}: no checksum to verify {path} against; delete it and provision it "
+                                 f"again (python models.py provision {variant.name}), or give its sha256 in a registry")
+            with open(self.path(variant) + ".sha256", "w") as f:
+                f.write(f"{actual}  {variant.filename}\n")
+        elif actual != expected:
+            raise ModelError(f"{variant.name}: {path} has SHA-256 {actual}, expected {expected}")
+        self._verified[path] = (stat.st_size, stat.st_mtime)
+
+    def installed(self, variant: ModelVariant) -> bool:
+        """Present in the cache and matching its checksum."""
+        if not os.path.exists(self.path(variant)):
+            return False
+        try:
+            self.verify(variant)
+        except (ModelError, OSError):
+            return False
+        return True
+
+    def fetch(self, variant: ModelVariant) -> str:
+        """Path of a verified bundle, downloading it first if allowed and needed."""
+        path = self.path(variant)
+        if os.path.exists(path):
+            self.verify(variant)
+            return path
+        if not self.allow_download:
+            raise ModelError(f"{variant.name} is not provisioned in {self.directory} and downloads are off")
+        if not variant.url:
+            raise ModelError(f"{variant.name} has no download URL; copy {variant.filename} into {self.directory}")
+
+        print(f"Downloading {variant.name} model...")
+        os.makedirs(self.directory, exist_ok=True)
+        partial = path + ".part"
+        try:
+            urllib.request.urlretrieve(variant.url, partial)
+            self.verify(variant, partial, pin=True)
+            os.replace(partial, path)
+        except Exception as e:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            if isinstance(e, ModelError):
+                raise
+            raise ModelError(f"Failed to download {variant.name}: {e}") from e
+        self._verified[path] = self._verified.pop(partial)
+        print("Model downloaded successfully!")
+        return path
+
+
+def time_inference(recognizer, images: list, runs: int = 30) -> float:
+    """Median seconds per recognize() call over runs calls cycling through images."""
+    for image in images[:2]:
+        recognizer.recognize(image)
+    durations = []
+    for i in range(runs):
+        started = time.perf_counter()
+        recognizer.recognize(images[i % len(images)])
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def host_key() -> dict:
+    """What makes timings from an earlier start valid for this one."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    try:
+        from importlib.metadata import version
+        mediapipe = version("mediapipe")
+    except Exception:
+        mediapipe = None
+    return {"host": platform.node(), "machine": platform.machine(), "cpu": cpu,
+            "cpus": os.cpu_count(), "mediapipe": mediapipe}
+
+
+def select_variant(cache: ModelCache, measure: Callable, accuracy_floor: float = DEFAULT_ACCURACY_FLOOR,
+                   remeasure: bool = False, sample: Optional[str] = None):
+    """Pick the fastest installed variant with accuracy >= accuracy_floor.
+
+    measure(variant, path) returns seconds per inference on sample; it is
+    only called for variants without a stored timing for this host, bundle
+    checksum and sample (None: whichever sample the stored one used), and
+    not at all when a single variant qualifies.
+    Returns (variant, report), report being a dict for the startup log.
+    """
+    timings_path = os.path.join(cache.directory, TIMINGS_FILE)
+    key = host_key()
+    stored = {}
+    if not remeasure:
+        try:
+            with open(timings_path) as f:
+                saved = json.load(f)
+            if saved.get("host") == key:
+                stored = saved.get("variants", {})
+        except (OSError, ValueError):
+            pass
+
+    candidates = [variant for variant in VARIANTS.values()
+                  if variant.accuracy is not None and variant.accuracy >= accuracy_floor and cache.installed(variant)]
+    if not candidates:
+        raise ModelError(f"No installed variant has accuracy >= {accuracy_floor:g}; "
+                         f"provision one (python models.py provision) or lower the floor")
+    if len(candidates) == 1:
+        return candidates[0], {"variant": candidates[0].name, "accuracy_floor": accuracy_floor,
+                               "measured": False, "latency_ms": {}}
+
+    timings = {}
+    measured = False
+    for variant in candidates:
+        sha256 = cache.expected_sha256(variant)
+        entry = stored.get(variant.name)
+        # Timings stored without their sample were taken on frames without hands
+        if entry and entry.get("sha256") == sha256 and entry.get("sample") and sample in (None, entry["sample"]):
+            timings[variant.name] = entry
+            continue
+        print(f"Timing {variant.name}...")
+        timings[variant.name] = {"sha256": sha256, "sample": sample,
+                                 "latency_ms": round(measure(variant, cache.path(variant)) * 1000, 3)}
+        measured = True
+
+    if measured:
+        try:
+            with open(timings_path, "w") as f:
+                json.dump({"host": key, "variants": {**stored, **timings}}, f, indent=2)
+        except OSError as e:
+            print(f"Could not save model timings: {e}")
+
+    best = min(candidates, key=lambda variant: timings[variant.name]["latency_ms"])
+    report = {
+        "variant": best.name,
+        "accuracy_floor": accuracy_floor,
+        "measured": measured,
+        "latency_ms": {name: timing["latency_ms"] for name, timing in timings.items()}
+    }
+    return best, report
+
+
+def resolve_names(names: list) -> list:
+    if not names or names == ["all"]:
+        return list(VARIANTS.values())
+    unknown = [name for name in names if name not in VARIANTS]
+    if unknown:
+        raise ModelError(f"Unknown variant(s): {', '.join(unknown)}; known: {', '.join(VARIANTS)}")
+    return [VARIANTS[name] for name in names]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List, provision and verify hand tracking model variants")
+    parser.add_argument("command", choices=["list", "provision", "verify"],
+                        help="list: show variants and their cache state; provision: download and verify "
+                             "them; verify: check installed ones against their checksums")
+    parser.add_argument("variants", nargs="*", help="Variant names (default: all)")
+    parser.add_argument("--model-dir", default=DEFAULT_CACHE_DIR, help=f"Model cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--registry", help="JSON file with more variants, or checksums and accuracy for built-in ones")
+
+    args = parser.parse_args()
+
+    try:
+        if args.registry:
+            load_registry(args.registry)
+        variants = resolve_names(args.variants)
+    except (OSError, ValueError, TypeError, ModelError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    cache = ModelCache(args.model_dir)
+
+    failed = False
+    for variant in variants:
+        if args.command == "list":
+            if cache.installed(variant):
+                state = "installed"
+            elif not os.path.exists(cache.path(variant)):
+                state = "not installed"
+            else:
+                state = "checksum mismatch" if cache.expected_sha256(variant) else "no checksum"
+            accuracy = f"{variant.accuracy:.3f}" if variant.accuracy is not None else "-"
+            print(f"{variant.name:<26}{variant.backend:<20}{accuracy:>9}  {state:<18}{variant.description}")
+            continue
+        path = cache.path(variant)
+        if args.command == "verify" and not os.path.exists(path):
+            print(f"{variant.name}: not installed")
+            continue
+        try:
+            if args.command == "provision":
+                cache.fetch(variant)
+            else:
+                cache.verify(variant)
+            print(f"{variant.name}: OK {path} sha256 {cache.expected_sha256(variant)}")
+        except (ModelError, OSError) as e:
+            print(f"{variant.name}: FAILED {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
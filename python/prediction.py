@@ -0,0 +1,139 @@
+"""
+Frame skipping: run the recognizer on some camera frames and predict the rest.
+
+InferenceScheduler decides which camera frames get real inference. With a
+fixed interval it runs every Nth frame; in auto mode N follows the measured
+inference time so inference stays within a fraction (the budget) of the
+camera's frame time. MotionPredictor extrapolates the landmarks of the
+frames in between with a constant-velocity model, so clients still get a
+stream at camera rate. Predicted frames carry HandFrame.predicted.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from hand_frame import HandFrame, NUM_LANDMARKS
+
+
+class MotionPredictor:
+    """Constant-velocity extrapolation from the last inferred frames.
+
+    Each hand slot keeps its last position and a velocity estimate, blended
+    with velocity_alpha so a single noisy result does not fling the hand.
+    Extrapolation stops after max_gap seconds; a hand that has not been seen
+    by inference stays where it was last seen.
+    """
+
+    def __init__(self, velocity_alpha: float = 0.6, max_gap: float = 0.2):
+        self.velocity_alpha = velocity_alpha
+        self.max_gap = max_gap
+        self._reference: Optional[HandFrame] = None
+        self._time = 0.0
+        self._velocity = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    @property
+    def tracking(self) -> bool:
+        return self._reference is not None and bool(self._reference.present.any())
+
+    def reset(self):
+        self._reference = None
+        self._velocity[:] = 0.0
+
+    def update(self, frame: HandFrame, now: float):
+        """Take an inferred frame captured at now as the new reference.
+
+        The arrays are captured here, so later smoothing (which replaces
+        frame.landmarks) does not feed back into the prediction.
+        """
+        reference = HandFrame(frame.landmarks, frame.present.copy(), frame.gestures.copy(), frame.num_hands)
+        previous = self._reference
+        if previous is not None and now > self._time:
+            velocity = (reference.landmarks - previous.landmarks) / (now - self._time)
+            velocity = self._velocity + self.velocity_alpha * (velocity - self._velocity)
+            # Only hands seen in both frames have a meaningful velocity
+            tracked = (reference.present & previous.present)[:, None, None]
+            self._velocity = np.where(tracked, velocity, 0.0).astype(np.float32)
+        else:
+            self._velocity[:] = 0.0
+
+        self._reference = reference
+        self._time = now
+
+    def predict(self, now: float, timestamp: int) -> Optional[HandFrame]:
+        """Extrapolate the last inferred frame to now, or None before the first."""
+        reference = self._reference
+        if reference is None:
+            return None
+
+        dt = min(max(now - self._time, 0.0), self.max_gap)
+        frame = HandFrame(
+            landmarks=reference.landmarks + self._velocity * dt,
+            present=reference.present.copy(),
+            gestures=reference.gestures.copy(),
+            num_hands=reference.num_hands,
+            timestamp=timestamp
+        )
+        frame.predicted = True
+        return frame
+
+
+class InferenceScheduler:
+    """Picks which camera frames get real inference.
+
+    interval is N for "every Nth frame"; 0 selects auto mode, where N is the
+    smallest interval that keeps the average inference time per camera frame
+    under budget (a fraction of the camera frame time), capped at max_interval.
+    """
+
+    def __init__(self, interval: int = 0, budget: float = 0.5, max_interval: int = 6, ema_alpha: float = 0.1):
+        self.auto = interval <= 0
+        self.interval = 1 if self.auto else interval
+        self.budget = budget
+        self.max_interval = max_interval
+        self.ema_alpha = ema_alpha
+        self.inferred = 0
+        self.predicted = 0
+        self._since_inference = 0
+        self._inference_time = 0.0
+        self._frame_interval = 0.0
+        self._last_capture: Optional[float] = None
+
+    def should_infer(self, captured_at: float, tracking: bool) -> bool:
+        """Whether the frame captured at captured_at gets inference.
+
+        Frames are always inferred while no hand is tracked, since there is
+        nothing to predict from and a new hand should be picked up at once.
+        """
+        if self._last_capture is not None and captured_at > self._last_capture:
+            self._frame_interval = self._ema(self._frame_interval, captured_at - self._last_capture)
+        self._last_capture = captured_at
+
+        self._since_inference += 1
+        if not tracking or self._since_inference >= self.interval:
+            self._since_inference = 0
+            self.inferred += 1
+            return True
+        self.predicted += 1
+        return False
+
+    def record_inference(self, seconds: float):
+        """Feed a measured inference time; in auto mode, retune the interval."""
+        self._inference_time = self._ema(self._inference_time, seconds)
+        if self.auto and self._frame_interval > 0:
+            needed = math.ceil(self._inference_time / (self._frame_interval * self.budget))
+            self.interval = min(max(needed, 1), self.max_interval)
+
+    def _ema(self, average: float, sample: float) -> float:
+        return sample if average == 0.0 else average + self.ema_alpha * (sample - average)
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "auto": self.auto,
+            "inferred": self.inferred,
+            "predicted": self.predicted,
+            "inference_ms": round(self._inference_time * 1000, 2),
+            "frame_interval_ms": round(self._frame_interval * 1000, 2)
+        }
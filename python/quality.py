@@ -0,0 +1,111 @@
+"""
+Adaptive quality: trade tracking quality for latency to stay under a budget.
+
+QualityController watches the latency of inferred frames (capture to
+published) and walks a ladder of quality levels. Each level sets the
+inference resolution (a scale on the camera frame), the inference interval
+(every Nth frame, the rest predicted; see prediction.py) and num_hands.
+It steps down one level when the smoothed latency has been over budget for
+down_after seconds, and back up when it has stayed under headroom * budget
+for up_after seconds, so the same build settles at the best level a
+machine can sustain. A level that had to be left again right after
+stepping up to it is retried only after twice as long each time, so the
+controller does not keep oscillating around a level the machine cannot hold.
+"""
+
+from typing import Optional
+
+# Best quality first; each step gives up a little more
+LEVELS = [
+    {"scale": 1.0, "infer_every": 1, "num_hands": 2},
+    {"scale": 0.75, "infer_every": 1, "num_hands": 2},
+    {"scale": 0.5, "infer_every": 1, "num_hands": 2},
+    {"scale": 0.5, "infer_every": 2, "num_hands": 2},
+    {"scale": 0.5, "infer_every": 3, "num_hands": 2},
+    {"scale": 0.5, "infer_every": 3, "num_hands": 1},
+]
+KNOBS = ["scale", "infer_every", "num_hands"]
+
+
+def available_levels(knobs) -> list:
+    """LEVELS with the knobs not in knobs held at their best setting.
+
+    Levels that become identical are merged, so every step changes something.
+    """
+    levels = []
+    for level in LEVELS:
+        level = {knob: value if knob in knobs else LEVELS[0][knob] for knob, value in level.items()}
+        if not levels or level != levels[-1]:
+            levels.append(level)
+    return levels
+
+
+class QualityController:
+    """Steps through quality levels to hold latency under budget (seconds).
+
+    observe() takes one latency sample and returns a change event (a dict
+    for the status message) when the level changes, else None. The EMA is
+    restarted after each change, so the next decision is based only on
+    latencies measured at the new level.
+    """
+
+    def __init__(self, budget: float, knobs=KNOBS, headroom: float = 0.6, down_after: float = 1.0,
+                 up_after: float = 5.0, ema_alpha: float = 0.1):
+        self.budget = budget
+        self.levels = available_levels(knobs)
+        self.headroom = headroom
+        self.down_after = down_after
+        self.up_after = up_after
+        self.ema_alpha = ema_alpha
+        self.level = 0
+        self.changes = 0
+        self._failures = [0] * len(self.levels)  # Times each level was left soon after stepping up to it
+        self._stepped_up = False
+        self._latency: Optional[float] = None
+        self._over_since: Optional[float] = None
+        self._under_since: Optional[float] = None
+
+    @property
+    def current(self) -> dict:
+        return self.levels[self.level]
+
+    def observe(self, latency: float, now: float) -> Optional[dict]:
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency += self.ema_alpha * (latency - self._latency)
+
+        if self._latency > self.budget:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            if now - self._over_since >= self.down_after and self.level < len(self.levels) - 1:
+                return self._change(self.level + 1, "over budget")
+        elif self._latency < self.budget * self.headroom:
+            self._over_since = None
+            if self._under_since is None:
+                self._under_since = now
+            retry_delay = self.up_after * 2 ** min(self._failures[self.level - 1], 4) if self.level else 0.0
+            if self.level > 0 and now - self._under_since >= retry_delay:
+                return self._change(self.level - 1, "headroom")
+        else:
+            self._over_since = self._under_since = None
+        return None
+
+    def _change(self, level: int, reason: str) -> dict:
+        latency = self._latency
+        if level > self.level and self._stepped_up:
+            self._failures[self.level] += 1
+        self._stepped_up = level < self.level
+        self.level = level
+        self.changes += 1
+        self._latency = self._over_since = self._under_since = None
+        return {**self.describe(), "reason": reason, "latency_ms": round(latency * 1000, 1)}
+
+    def describe(self) -> dict:
+        return {
+            "level": self.level,
+            "levels": len(self.levels),
+            "budget_ms": round(self.budget * 1000, 1),
+            **self.current
+        }
@@ -0,0 +1,88 @@
+"""
+On-disk recordings of the post-inference landmark stream.
+
+A recording is a 16-byte header followed by fixed-size records (RECORD_DTYPE),
+one per frame, so it can be appended to while tracking and memory-mapped for
+replay without parsing. The "time" field (seconds since recording start) is
+the timestamp index used to reproduce the original pacing. "flags" marks
+frames predicted between inference passes (FLAG_PREDICTED); recordings made
+before it existed have the byte zeroed, so they read as all inferred.
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+
+import wire_format
+from hand_frame import HandFrame, NUM_LANDMARKS
+
+MAGIC = b"HTREC001"
+HEADER_SIZE = 16
+FLAG_PREDICTED = 1  # HandFrame.predicted, see prediction.py
+
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),             # seconds since recording start
+    ("timestamp", "<u4"),        # frame counter from the live payload
+    ("num_hands", "u1"),
+    ("hand_mask", "u1"),         # wire_format.HAND_LEFT | HAND_RIGHT
+    ("gestures", "u1", (2,)),    # left, right ids in hand_frame.GESTURE_NAMES
+    ("two_open_palms", "u1"),
+    ("flags", "u1"),             # FLAG_PREDICTED
+    ("landmarks", "<f4", (2, NUM_LANDMARKS, 3)),  # left, right
+])
+
+
+class LandmarkRecorder:
+    """Appends HandFrames to a recording file."""
+
+    def __init__(self, path: str, clock_start: float):
+        self.path = path
+        self.frames = 0
+        self._clock_start = clock_start
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC.ljust(HEADER_SIZE, b"\0"))
+
+    def write(self, frame: HandFrame, now: float):
+        record = self._record[0]
+        record["time"] = now - self._clock_start
+        record["timestamp"] = frame.timestamp & 0xFFFFFFFF
+        record["num_hands"] = frame.num_hands
+        record["hand_mask"] = wire_format.hand_mask(frame)
+        record["gestures"] = frame.gestures
+        record["two_open_palms"] = frame.two_open_palms
+        record["flags"] = FLAG_PREDICTED if frame.predicted else 0
+        record["landmarks"] = frame.landmarks
+
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+
+def load_recording(path: str) -> np.ndarray:
+    """Memory-map a recording; a partially written last record is ignored."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def record_to_frame(record, timestamp: Optional[int] = None) -> HandFrame:
+    """View one recorded frame as a HandFrame (landmarks are not copied)."""
+    present = np.array([record["hand_mask"] & bit for _, bit in wire_format.HAND_BITS], dtype=bool)
+    frame = HandFrame(
+        landmarks=record["landmarks"],
+        present=present,
+        gestures=record["gestures"],
+        num_hands=int(record["num_hands"]),
+        timestamp=int(record["timestamp"]) if timestamp is None else timestamp
+    )
+    frame.predicted = bool(record["flags"] & FLAG_PREDICTED)
+    return frame
@@ -0,0 +1,99 @@
+"""
+Region-of-interest selection for cropped, reduced-resolution inference.
+
+While hands are tracked, the next frame only needs to be searched around where
+they were: RoiTracker picks an expanded box around the last detected hands,
+and the recognizer runs on that crop (downscaled to at most roi_size pixels)
+instead of the whole 640x480 frame. When tracking is lost, or every
+refresh_interval frames so a new hand entering elsewhere is still found, it
+falls back to a downscaled full-frame search.
+
+Regions are normalized (x0, y0, x1, y1) boxes in full-frame space;
+remap_to_frame maps crop-relative landmarks back into that space.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from hand_frame import HandFrame
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+
+
+class RoiTracker:
+    """Chooses the crop and inference resolution for the next frame.
+
+    margin expands the hands' bounding box by that fraction of its size on
+    every side so movement between frames stays inside the crop. The crop is
+    kept square in pixels (the palm detector letterboxes to a square anyway)
+    and never smaller than min_size of the frame's short side.
+    """
+
+    def __init__(self, margin: float = 0.5, min_size: float = 0.3, roi_size: int = 256,
+                 search_size: int = 320, refresh_interval: int = 30):
+        self.margin = margin
+        self.min_size = min_size
+        self.roi_size = roi_size
+        self.search_size = search_size
+        self.refresh_interval = refresh_interval
+        self.searches = 0
+        self.crops = 0
+        self._box: Optional[tuple] = None
+        self._since_search = 0
+
+    def reset(self):
+        self._box = None
+
+    def next_region(self, width: int, height: int):
+        """Pixel crop and resize factor for the next frame.
+
+        Returns (x0, y0, x1, y1, scale); the crop is frame[y0:y1, x0:x1] and
+        scale (<= 1) is applied to it before inference.
+        """
+        self._since_search += 1
+        if self._box is None or self._since_search >= self.refresh_interval:
+            self._since_search = 0
+            self.searches += 1
+            return 0, 0, width, height, min(1.0, self.search_size / max(width, height))
+
+        bx0, by0, bx1, by1 = self._box
+        cx = (bx0 + bx1) / 2 * width
+        cy = (by0 + by1) / 2 * height
+        side = max((bx1 - bx0) * width, (by1 - by0) * height) * (1.0 + 2.0 * self.margin)
+        side = max(side, self.min_size * min(width, height))
+
+        # Shift the square back inside the frame before clipping what still overflows
+        half = side / 2
+        cx = min(max(cx, half), width - half)
+        cy = min(max(cy, half), height - half)
+        x0, x1 = max(int(cx - half), 0), min(int(cx + half + 0.5), width)
+        y0, y1 = max(int(cy - half), 0), min(int(cy + half + 0.5), height)
+
+        self.crops += 1
+        return x0, y0, x1, y1, min(1.0, self.roi_size / max(x1 - x0, y1 - y0))
+
+    def update(self, frame: HandFrame):
+        """Track the hands of a full-frame (already remapped) result."""
+        if not frame.present.any():
+            self._box = None
+            return
+
+        points = frame.landmarks[frame.present][..., :2].reshape(-1, 2)
+        x0, y0 = np.clip(points.min(axis=0), 0.0, 1.0)
+        x1, y1 = np.clip(points.max(axis=0), 0.0, 1.0)
+        self._box = (float(x0), float(y0), float(x1), float(y1))
+
+
+def remap_to_frame(frame: HandFrame, region: tuple):
+    """Map landmarks normalized to a crop back to full-frame normalized space.
+
+    z is scaled like x, since MediaPipe normalizes depth by image width.
+    """
+    if region == FULL_FRAME or not frame.present.any():
+        return
+
+    x0, y0, x1, y1 = region
+    scale = np.array([x1 - x0, y1 - y0, x1 - x0], dtype=np.float32)
+    offset = np.array([x0, y0, 0.0], dtype=np.float32)
+    frame.landmarks = np.where(frame.present[:, None, None], frame.landmarks * scale + offset, frame.landmarks)
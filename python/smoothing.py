@@ -0,0 +1,96 @@
+"""
+Temporal smoothing for landmark jitter.
+
+Both filters run as a handful of NumPy operations over the whole (2, 21, 3)
+landmark block of a HandFrame rather than per landmark. Each hand slot keeps
+its own state, which is reset whenever that hand stops being tracked so a
+returning hand does not glide in from its old position.
+"""
+
+import math
+
+import numpy as np
+
+from hand_frame import HandFrame, NUM_LANDMARKS
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al.): adaptive low-pass on every coordinate.
+
+    min_cutoff (Hz) sets how hard slow movement is smoothed; beta raises the
+    cutoff with speed so fast movement stays responsive; d_cutoff (Hz)
+    smooths the speed estimate itself.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 5.0, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._value = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._speed = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._time = np.zeros((2, 1, 1), dtype=np.float64)
+        self._active = np.zeros(2, dtype=bool)
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def apply(self, frame: HandFrame, now: float):
+        """Replace frame.landmarks with the filtered values (never in place)."""
+        present = frame.present
+        fresh = present & ~self._active
+        self._active = present.copy()
+        if not present.any():
+            return
+
+        raw = frame.landmarks
+        dt = np.maximum(now - self._time, 1e-3)
+        speed = (raw - self._value) / dt
+        speed = self._speed + self._alpha(dt, self.d_cutoff) * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(speed)
+        value = self._value + self._alpha(dt, cutoff) * (raw - self._value)
+
+        # Newly tracked hands start from their raw position at rest
+        fresh_mask = fresh[:, None, None]
+        value = np.where(fresh_mask, raw, value).astype(np.float32)
+        speed = np.where(fresh_mask, 0.0, speed).astype(np.float32)
+
+        keep = present[:, None, None]
+        self._value = np.where(keep, value, self._value)
+        self._speed = np.where(keep, speed, self._speed)
+        self._time[present] = now
+        frame.landmarks = np.where(keep, value, raw)
+
+
+class EmaFilter:
+    """Exponential moving average with a fixed weight on the newest sample."""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self._value = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._active = np.zeros(2, dtype=bool)
+
+    def apply(self, frame: HandFrame, now: float):
+        present = frame.present
+        fresh = present & ~self._active
+        self._active = present.copy()
+        if not present.any():
+            return
+
+        raw = frame.landmarks
+        value = self._value + self.alpha * (raw - self._value)
+        value = np.where(fresh[:, None, None], raw, value).astype(np.float32)
+
+        keep = present[:, None, None]
+        self._value = np.where(keep, value, self._value)
+        frame.landmarks = np.where(keep, value, raw)
+
+
+def create_smoother(kind: str, min_cutoff: float, beta: float, d_cutoff: float, ema_alpha: float):
+    """Build the filter selected on the command line, or None for "off"."""
+    if kind == "one-euro":
+        return OneEuroFilter(min_cutoff, beta, d_cutoff)
+    if kind == "ema":
+        return EmaFilter(ema_alpha)
+    return None
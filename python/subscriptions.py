@@ -0,0 +1,132 @@
+"""
+Per-client subscriptions: which fields, how often and in which encoding.
+
+By default every client gets every frame in full, in the format it
+negotiated. A client can narrow that down with a control message:
+
+    {"type": "subscribe", "fields": ["gestures"], "max_rate": 10, "encoding": "json"}
+
+fields:   any of FIELDS; "landmarks" is short for both hands. "metrics"
+          adds the metrics message (see hand_tracker.metrics_message).
+max_rate: frames (and metrics messages) per second, 0 for every frame.
+          In change-driven mode the latest frame skipped by the limit is
+          sent once the next slot opens, so the last change is not lost.
+encoding: "json", "f32" or "i16"; defaults to the negotiated subprotocol.
+
+Frames are encoded once per distinct (fields, encoding) variant, and the
+bytes are shared by every client subscribed to that variant.
+"""
+
+import json
+import math
+from typing import Optional
+
+import wire_format
+from hand_frame import HandFrame, LEFT, RIGHT
+
+FRAME_FIELDS = ["gestures", "left_hand", "right_hand"]
+FIELDS = FRAME_FIELDS + ["metrics"]
+FIELD_ALIASES = {"landmarks": ["left_hand", "right_hand"]}
+
+ENCODINGS = {
+    "json": None,
+    "f32": wire_format.SUBPROTOCOL_F32,
+    "i16": wire_format.SUBPROTOCOL_I16,
+}
+
+
+class Subscription:
+    """What one client receives; see the module docstring.
+
+    variant identifies the encoded frame bytes, so clients with equal
+    variants share them. A metrics-only subscription has variant None.
+    """
+
+    def __init__(self, fields=FRAME_FIELDS, max_rate: float = 0.0, encoding: Optional[str] = None):
+        self.fields = frozenset(fields)
+        self.max_rate = max_rate
+        self.encoding = encoding  # Subprotocol name, None for JSON
+        frame_fields = self.fields.intersection(FRAME_FIELDS)
+        self.variant = (frame_fields, encoding) if frame_fields else None
+        self._last_frame = float("-inf")
+        self._last_metrics = float("-inf")
+
+    @property
+    def wants_metrics(self) -> bool:
+        return "metrics" in self.fields
+
+    def frame_due(self, now: float) -> bool:
+        """Whether a frame at now fits the rate limit; claims the slot if so."""
+        if not self.max_rate or now - self._last_frame >= 1.0 / self.max_rate:
+            self._last_frame = now
+            return True
+        return False
+
+    def frame_wait(self, now: float) -> float:
+        """Seconds until frame_due(now) would be True again."""
+        if not self.max_rate:
+            return 0.0
+        return max(0.0, self._last_frame + 1.0 / self.max_rate - now)
+
+    def metrics_due(self, now: float) -> bool:
+        """Like frame_due, for metrics; without a max_rate they go out once a second."""
+        if now - self._last_metrics >= 1.0 / (self.max_rate or 1.0):
+            self._last_metrics = now
+            return True
+        return False
+
+    def describe(self) -> dict:
+        encoding = next(name for name, protocol in ENCODINGS.items() if protocol == self.encoding)
+        return {
+            "type": "subscribed",
+            "fields": sorted(self.fields),
+            "max_rate": self.max_rate,
+            "encoding": encoding
+        }
+
+
+def parse_subscription(request: dict, subprotocol: Optional[str]) -> Subscription:
+    """Build a Subscription from a subscribe message.
+
+    Raises ValueError for unknown fields or encodings, or a bad max_rate.
+    """
+    fields = request.get("fields", FRAME_FIELDS)
+    if isinstance(fields, str) or not isinstance(fields, list):
+        raise ValueError("fields must be a list")
+    expanded = []
+    for field in fields:
+        if not isinstance(field, str):
+            raise ValueError(f"Fields must be strings, got {field!r}")
+        if field not in FIELDS and field not in FIELD_ALIASES:
+            raise ValueError(f"Unknown field: {field}")
+        expanded.extend(FIELD_ALIASES.get(field, [field]))
+
+    try:
+        max_rate = float(request.get("max_rate", 0.0))
+    except (TypeError, ValueError):
+        raise ValueError("max_rate must be a number") from None
+    if not math.isfinite(max_rate) or max_rate < 0:
+        raise ValueError("max_rate must be a finite, non-negative number")
+
+    encoding = request.get("encoding")
+    if encoding is None:
+        protocol = subprotocol
+    elif isinstance(encoding, str) and encoding in ENCODINGS:
+        protocol = ENCODINGS[encoding]
+    else:
+        raise ValueError(f"Unknown encoding: {encoding!r}")
+
+    return Subscription(expanded, max_rate, protocol)
+
+
+def encode_variant(frame: HandFrame, variant: tuple):
+    """Encode a frame for one (fields, encoding) variant.
+
+    Binary frames always carry both gesture ids (two bytes); fields only
+    decides which hands' landmarks are included.
+    """
+    fields, protocol = variant
+    if protocol is None:
+        return json.dumps(frame.to_payload(fields))
+    sides = [side for side, name in ((LEFT, "left_hand"), (RIGHT, "right_hand")) if name in fields]
+    return wire_format.encode_frame(frame, protocol == wire_format.SUBPROTOCOL_I16, sides)
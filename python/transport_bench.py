@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Latency comparison of the WebSocket, UDP and Unix socket transports.
+
+Connects to a running hand_tracker.py (started with --transport udp
+--transport unix for the local transports), pings it over each transport
+while frames stream in, and reports round-trip times, frame inter-arrival
+jitter and, for UDP, lost and out-of-order datagrams. Pings are queued
+behind frames like any other message, so the round trip includes the
+server's send queue. Use --replay or a synthetic --source on the server for
+repeatable runs.
+
+Usage:
+    python transport_bench.py websocket udp unix [--duration 10] [--json results.json]
+    python transport_bench.py unix --encoding i16 --fields gestures
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import websockets
+
+import transports
+from metrics import LatencyHistogram
+from subscriptions import ENCODINGS
+
+
+class WebSocketLink:
+    def __init__(self, port: int):
+        self.port = port
+
+    async def open(self):
+        self._ws = await websockets.connect(f"ws://127.0.0.1:{self.port}")
+
+    async def send(self, text: str):
+        await self._ws.send(text)
+
+    async def recv(self):
+        """Next message and its sequence number (None unless sequenced)."""
+        return await self._ws.recv(), None
+
+    async def close(self):
+        await self._ws.close()
+
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def datagram_received(self, data: bytes, address: tuple):
+        self.queue.put_nowait(data)
+
+
+class UdpLink:
+    def __init__(self, port: int):
+        self.port = port
+
+    async def open(self):
+        self._transport, self._protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+            _DatagramReceiver, remote_addr=("127.0.0.1", self.port)
+        )
+        self._transport.sendto(b"")  # Register with the server
+
+    async def send(self, text: str):
+        self._transport.sendto(text.encode())
+
+    async def recv(self):
+        data = await self._protocol.queue.get()
+        seq, kind = transports.FRAME_HEADER.unpack_from(data)
+        return transports.unpack_payload(kind, data[transports.FRAME_HEADER.size:]), seq
+
+    async def close(self):
+        self._transport.close()
+
+
+class UnixLink:
+    def __init__(self, path: str):
+        self.path = path
+
+    async def open(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+
+    async def send(self, text: str):
+        self._writer.write(transports.pack_message(None, text))
+        await self._writer.drain()
+
+    async def recv(self):
+        length, kind = transports.FRAME_HEADER.unpack(await self._reader.readexactly(transports.FRAME_HEADER.size))
+        return transports.unpack_payload(kind, await self._reader.readexactly(length)), None
+
+    async def close(self):
+        self._writer.close()
+
+
+async def measure(link, duration: float, ping_interval: float, subscription: dict) -> dict:
+    """Stream frames and ping over one link for duration seconds."""
+    await link.open()
+    rtt = LatencyHistogram(100000)
+    gaps = LatencyHistogram(100000)
+    frames = lost = stale = pings = 0
+    bytes_received = 0
+    last_seq = None
+    last_frame = None
+
+    async def pinger():
+        nonlocal pings
+        while True:
+            # Also keeps a UDP registration alive
+            await link.send(json.dumps({"type": "ping", "t": time.perf_counter()}))
+            pings += 1
+            await asyncio.sleep(ping_interval)
+
+    if subscription:
+        await link.send(json.dumps({"type": "subscribe", **subscription}))
+    ping_task = asyncio.create_task(pinger())
+    deadline = time.perf_counter() + duration
+    try:
+        while (remaining := deadline - time.perf_counter()) > 0:
+            try:
+                message, seq = await asyncio.wait_for(link.recv(), remaining)
+            except asyncio.TimeoutError:
+                break
+            now = time.perf_counter()
+
+            if seq is not None:
+                if last_seq is not None and seq <= last_seq:
+                    stale += 1  # Newest wins: a later datagram already arrived
+                    continue
+                if last_seq is not None:
+                    lost += seq - last_seq - 1
+                last_seq = seq
+
+            if isinstance(message, str) and message.startswith('{"type"'):
+                reply = json.loads(message)
+                if reply["type"] == "pong":
+                    rtt.record(now - reply["t"])
+                continue
+
+            frames += 1
+            bytes_received += len(message)
+            if last_frame is not None:
+                gaps.record(now - last_frame)
+            last_frame = now
+    finally:
+        ping_task.cancel()
+        await link.close()
+
+    return {
+        "frames": frames,
+        "fps": round(frames / duration, 2),
+        "avg_frame_bytes": round(bytes_received / frames) if frames else 0,
+        "pings": pings,
+        "pongs": len(rtt),
+        "lost": lost,
+        "stale": stale,
+        "rtt": rtt.summary(),
+        "frame_gap": gaps.summary()
+    }
+
+
+def print_report(results: dict):
+    print(f"{'transport':<11}{'fps':>8}{'bytes':>8}{'rtt p50':>10}{'rtt p95':>10}{'rtt p99':>10}"
+          f"{'gap p95':>10}{'lost':>7}{'stale':>7}")
+    for name, result in results.items():
+        rtt, gap = result["rtt"], result["frame_gap"]
+        print(f"{name:<11}{result['fps']:>8.1f}{result['avg_frame_bytes']:>8}"
+              f"{rtt.get('p50_ms', 0):>10.3f}{rtt.get('p95_ms', 0):>10.3f}{rtt.get('p99_ms', 0):>10.3f}"
+              f"{gap.get('p95_ms', 0):>10.3f}{result['lost']:>7}{result['stale']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand tracking transport latency comparison")
+    parser.add_argument("transports", nargs="+", choices=["websocket", *transports.TRANSPORTS],
+                        help="Transports to measure, one after the other")
+    parser.add_argument("--port", type=int, default=8765, help="WebSocket port (default: 8765)")
+    parser.add_argument("--udp-port", type=int, help="UDP port (default: same as --port)")
+    parser.add_argument("--unix-socket", default="/tmp/hand_tracker.sock", help="Unix socket path")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per transport (default: 10)")
+    parser.add_argument("--ping-interval", type=float, default=0.05, help="Seconds between pings (default: 0.05)")
+    parser.add_argument("--encoding", choices=list(ENCODINGS), help="Subscribe to this encoding")
+    parser.add_argument("--fields", nargs="+", help="Subscribe to these fields only")
+    parser.add_argument("--json", help="Write results to this file")
+
+    args = parser.parse_args()
+
+    links = {
+        "websocket": WebSocketLink(args.port),
+        "udp": UdpLink(args.udp_port or args.port),
+        "unix": UnixLink(args.unix_socket),
+    }
+    subscription = {}
+    if args.encoding:
+        subscription["encoding"] = args.encoding
+    if args.fields:
+        subscription["fields"] = args.fields
+
+    results = {}
+    for name in args.transports:
+        results[name] = asyncio.run(measure(links[name], args.duration, args.ping_interval, subscription))
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
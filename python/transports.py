@@ -0,0 +1,269 @@
+"""
+Local transports served next to the WebSocket server: UDP and Unix sockets.
+
+Both carry the same payloads as the WebSocket (JSON text or wire_format
+binary frames, per the client's subscription) and hand each client to the
+same connection handler, through a small adapter with the parts of a
+websockets connection it uses: subprotocol, remote_address, send() and
+async iteration over incoming messages.
+
+Every message is prefixed with FRAME_HEADER (<IB): a length for the Unix
+socket stream, a per-client sequence number for UDP, and KIND_TEXT or
+KIND_BINARY. Clients send the same framing over the Unix socket, and plain
+UTF-8 JSON datagrams over UDP.
+
+The Unix socket transport needs asyncio Unix server support, which Windows
+lacks (UNIX_SOCKETS_SUPPORTED). A leftover socket file at the path is only
+replaced if nothing answers on it; any other file there is an error.
+
+UDP clients register by sending any datagram (an empty one is a keepalive)
+and are dropped after client_timeout seconds of silence. Datagrams may be
+lost or reordered; clients keep the highest sequence number seen and drop
+anything older, so the newest frame always wins.
+"""
+
+import asyncio
+import errno
+import os
+import socket
+import stat
+import struct
+import time
+from typing import Callable, Optional
+
+FRAME_HEADER = struct.Struct("<IB")
+KIND_TEXT = 0
+KIND_BINARY = 1
+MAX_MESSAGE_SIZE = 1 << 20
+
+TRANSPORTS = ["udp", "unix"]  # Served in addition to the WebSocket
+UNIX_SOCKETS_SUPPORTED = hasattr(asyncio, "start_unix_server")
+
+
+def pack_message(prefix: int, message) -> bytes:
+    """Frame a text or binary message behind FRAME_HEADER."""
+    if isinstance(message, str):
+        data, kind = message.encode(), KIND_TEXT
+    else:
+        data, kind = bytes(message), KIND_BINARY
+    return FRAME_HEADER.pack(prefix if prefix is not None else len(data), kind) + data
+
+
+def unpack_payload(kind: int, data: bytes):
+    return data.decode() if kind == KIND_TEXT else data
+
+
+class _Connection:
+    """Websocket-like view of one transport client."""
+
+    subprotocol = None  # JSON until the client subscribes to another encoding
+
+    def __init__(self, remote_address: tuple):
+        self.remote_address = remote_address
+        self.closed = False
+        self._incoming: asyncio.Queue = asyncio.Queue()
+
+    def receive(self, message):
+        self._incoming.put_nowait(message)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._incoming.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self._incoming.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class UdpConnection(_Connection):
+    """A UDP client: sends never block, lost datagrams are not resent."""
+
+    def __init__(self, transport: asyncio.DatagramTransport, address: tuple):
+        super().__init__(address)
+        self.last_seen = time.monotonic()
+        self._transport = transport
+        self._seq = 0
+
+    async def send(self, message):
+        if self.closed or self._transport.is_closing():
+            raise ConnectionResetError("UDP client gone")
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        self._transport.sendto(pack_message(self._seq, message), self.remote_address)
+
+
+class UnixConnection(_Connection):
+    """A Unix domain socket client, length-prefixed messages both ways."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client_id: int):
+        super().__init__(("unix", client_id))
+        self._reader = reader
+        self._writer = writer
+        self.transport = writer.transport
+        # drain() waits until the socket took the whole message, like the WebSocket server
+        self.transport.set_write_buffer_limits(0)
+
+    async def send(self, message):
+        self._writer.write(pack_message(None, message))
+        await self._writer.drain()
+
+    async def read_messages(self):
+        """Feed incoming messages to the handler until the client hangs up."""
+        try:
+            while True:
+                length, kind = FRAME_HEADER.unpack(await self._reader.readexactly(FRAME_HEADER.size))
+                if length > MAX_MESSAGE_SIZE:
+                    break
+                self.receive(unpack_payload(kind, await self._reader.readexactly(length)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.close()
+            self._writer.close()
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "UdpServer"):
+        self._server = server
+
+    def connection_made(self, transport):
+        self._server.transport = transport
+
+    def datagram_received(self, data: bytes, address: tuple):
+        self._server.datagram_received(data, address)
+
+
+class UdpServer:
+    """Serves handler(connection) to each UDP client, like websockets.serve."""
+
+    def __init__(self, handler: Callable, client_timeout: float = 5.0):
+        self.handler = handler
+        self.client_timeout = client_timeout
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._clients: dict = {}
+        self._tasks: set = set()
+        self._reaper: Optional[asyncio.Task] = None
+
+    def datagram_received(self, data: bytes, address: tuple):
+        connection = self._clients.get(address)
+        if connection is None:
+            connection = self._clients[address] = UdpConnection(self.transport, address)
+            task = asyncio.ensure_future(self._serve(connection))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        connection.last_seen = time.monotonic()
+        if data:
+            connection.receive(data.decode(errors="replace"))
+
+    async def _serve(self, connection: UdpConnection):
+        try:
+            await self.handler(connection)
+        finally:
+            connection.close()
+            self._clients.pop(connection.remote_address, None)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.client_timeout / 2)
+            cutoff = time.monotonic() - self.client_timeout
+            for connection in list(self._clients.values()):
+                if connection.last_seen < cutoff:
+                    connection.close()
+
+    def close(self):
+        if self._reaper:
+            self._reaper.cancel()
+        for connection in self._clients.values():
+            connection.close()
+        if self.transport:
+            self.transport.close()
+
+    async def wait_closed(self):
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=1.0)
+
+
+class UnixServer:
+    """Serves handler(connection) to each Unix socket client."""
+
+    def __init__(self, handler: Callable, path: str):
+        self.handler = handler
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._next_id = 0
+        self._socket_id: Optional[tuple] = None  # (device, inode) of the socket file we created
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._next_id += 1
+        connection = UnixConnection(reader, writer, self._next_id)
+        self._connections.add(connection)
+        reading = asyncio.ensure_future(connection.read_messages())
+        try:
+            await self.handler(connection)
+        finally:
+            self._connections.discard(connection)
+            reading.cancel()
+            writer.close()
+
+    def close(self):
+        if self._server:
+            self._server.close()
+        for connection in self._connections:
+            connection.close()
+
+    async def wait_closed(self):
+        if self._server:
+            await self._server.wait_closed()
+        try:
+            info = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+        if (info.st_dev, info.st_ino) == self._socket_id:  # Not replaced by another process meanwhile
+            os.unlink(self.path)
+
+
+def _remove_stale_socket(path: str):
+    """Unlink a socket file left over from a previous run.
+
+    Raises OSError if the path is something other than a socket, or a
+    socket another process is still serving.
+    """
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise OSError(errno.EEXIST, f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)  # Nobody listening
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"Another process is serving {path}")
+
+
+async def serve_udp(handler: Callable, host: str, port: int, client_timeout: float = 5.0) -> UdpServer:
+    server = UdpServer(handler, client_timeout)
+    await asyncio.get_running_loop().create_datagram_endpoint(lambda: _UdpProtocol(server), (host, port))
+    server._reaper = asyncio.ensure_future(server._reap())
+    return server
+
+
+async def serve_unix(handler: Callable, path: str) -> UnixServer:
+    if not UNIX_SOCKETS_SUPPORTED:
+        raise OSError(errno.EAFNOSUPPORT, "Unix domain sockets are not supported on this platform")
+    server = UnixServer(handler, path)
+    _remove_stale_socket(path)
+    server._server = await asyncio.start_unix_server(server._accept, path)
+    info = os.lstat(path)
+    server._socket_id = (info.st_dev, info.st_ino)
+    return server
@@ -0,0 +1,89 @@
+"""
+Compact binary wire format for hand tracking frames.
+
+Clients opt in per connection by requesting one of the WebSocket subprotocols
+below; clients that request none keep receiving the JSON payload.
+
+Frame layout (little-endian):
+    header      <BBBBI   version, flags, num_hands, hand_mask, timestamp
+    landmarks            21 x (x, y, z) per present hand, left hand first;
+                         float32, or int16 scaled by INT16_SCALE if FLAG_INT16
+    gestures    <BB      left, right gesture ids (index into hand_frame.GESTURE_NAMES)
+"""
+
+import struct
+
+import numpy as np
+
+from hand_frame import HandFrame, LEFT, NUM_LANDMARKS, RIGHT
+
+SUBPROTOCOL_F32 = "hand-tracking.f32"
+SUBPROTOCOL_I16 = "hand-tracking.i16"
+SUBPROTOCOLS = [SUBPROTOCOL_I16, SUBPROTOCOL_F32]
+
+VERSION = 1
+HEADER = struct.Struct("<BBBBI")
+GESTURES = struct.Struct("<BB")
+
+FLAG_INT16 = 0x01
+FLAG_TWO_OPEN_PALMS = 0x02
+FLAG_PREDICTED = 0x04
+
+HAND_LEFT = 0x01
+HAND_RIGHT = 0x02
+HAND_BITS = ((LEFT, HAND_LEFT), (RIGHT, HAND_RIGHT))
+
+INT16_SCALE = 16384.0  # +/-2.0 range, ~6e-5 resolution
+
+
+def hand_mask(frame: HandFrame, sides=(LEFT, RIGHT)) -> int:
+    return sum(bit for side, bit in HAND_BITS if frame.present[side] and side in sides)
+
+
+def encode_frame(frame: HandFrame, quantize: bool = False, sides=(LEFT, RIGHT)) -> bytes:
+    """Pack a HandFrame into a binary frame.
+
+    sides picks whose landmarks are included (num_hands still counts every
+    hand), for clients subscribed to only one hand or just the gestures.
+    """
+    flags = FLAG_INT16 if quantize else 0
+    if frame.two_open_palms:
+        flags |= FLAG_TWO_OPEN_PALMS
+    if frame.predicted:
+        flags |= FLAG_PREDICTED
+
+    mask = hand_mask(frame, sides)
+    landmarks = frame.landmarks[[side for side, bit in HAND_BITS if mask & bit]]
+    if quantize:
+        landmarks = np.clip(np.rint(landmarks * INT16_SCALE), -32768, 32767).astype("<i2")
+    else:
+        landmarks = landmarks.astype("<f4", copy=False)
+
+    header = HEADER.pack(VERSION, flags, frame.num_hands, mask, frame.timestamp & 0xFFFFFFFF)
+    gestures = GESTURES.pack(int(frame.gestures[LEFT]), int(frame.gestures[RIGHT]))
+    return header + landmarks.tobytes() + gestures
+
+
+def decode_frame(payload: bytes) -> HandFrame:
+    """Unpack a binary frame into a HandFrame."""
+    version, flags, num_hands, mask, timestamp = HEADER.unpack_from(payload, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported wire format version: {version}")
+
+    dtype = np.dtype("<i2") if flags & FLAG_INT16 else np.dtype("<f4")
+    frame = HandFrame(num_hands=num_hands, timestamp=timestamp)
+    frame.predicted = bool(flags & FLAG_PREDICTED)
+    offset = HEADER.size
+
+    for side, bit in HAND_BITS:
+        if not mask & bit:
+            continue
+        landmarks = np.frombuffer(payload, dtype=dtype, count=NUM_LANDMARKS * 3, offset=offset)
+        frame.landmarks[side] = landmarks.reshape(NUM_LANDMARKS, 3)
+        if flags & FLAG_INT16:
+            frame.landmarks[side] /= INT16_SCALE
+        frame.present[side] = True
+        offset += landmarks.nbytes
+
+    frame.gestures[:] = GESTURES.unpack_from(payload, offset)
+    return frame
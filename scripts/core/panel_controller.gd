@@ -33,8 +33,8 @@ var _action_bg: ColorRect
 # Hand overlay
 var _hand_overlay: CanvasLayer
 var _hand_draw: Control
-var _left_landmarks: Array = []
-var _right_landmarks: Array = []
+var _left_landmarks := PackedFloat32Array()  # x, y, z per landmark, see HandTracking
+var _right_landmarks := PackedFloat32Array()
 
 # Success effect
 var _success_overlay: ColorRect
@@ -121,8 +121,8 @@ func _draw_hands() -> void:
 	_draw_hand_landmarks(_right_landmarks, Color(1.0, 0.5, 0.2, 0.8))  # Orange
 
 
-func _draw_hand_landmarks(landmarks: Array, color: Color) -> void:
-	if landmarks.size() < 21:
+func _draw_hand_landmarks(landmarks: PackedFloat32Array, color: Color) -> void:
+	if landmarks.size() < 21 * 3:
 		return
 
 	# Hand connections for drawing skeleton
@@ -137,9 +137,9 @@ func _draw_hand_landmarks(landmarks: Array, color: Color) -> void:
 
 	# Convert normalized coordinates to screen coordinates
 	var points: Array[Vector2] = []
-	for lm in landmarks:
-		var x: float = (1.0 - lm.get("x", 0.5)) * 1024  # Mirror horizontally
-		var y: float = lm.get("y", 0.5) * 1024
+	for i in 21:
+		var x: float = (1.0 - landmarks[3 * i]) * 1024  # Mirror horizontally
+		var y: float = landmarks[3 * i + 1] * 1024
 		points.append(Vector2(x, y))
 
 	# Draw connections
@@ -212,7 +212,7 @@ func _setup_gesture_connections() -> void:
 		GestureDetector.landmarks_updated.connect(_on_landmarks_updated)
 
 
-func _on_landmarks_updated(left_hand: Array, right_hand: Array) -> void:
+func _on_landmarks_updated(left_hand: PackedFloat32Array, right_hand: PackedFloat32Array) -> void:
 	_left_landmarks = left_hand
 	_right_landmarks = right_hand
 	if _hand_draw:
@@ -6,16 +6,23 @@ extends Node
 signal gesture_detected(gesture_type: Enums.InteractionType)
 signal gesture_progress(gesture_type: Enums.InteractionType, progress: float)
 signal hands_detected(count: int)
-signal landmarks_updated(left_hand: Array, right_hand: Array)
+## Landmarks as HandTracking "coords": x, y, z per landmark, empty when the hand is absent
+signal landmarks_updated(left_hand: PackedFloat32Array, right_hand: PackedFloat32Array)
 
 # Hold time for gesture confirmation
 const GESTURE_HOLD_TIME := 0.5  # Seconds to hold gesture
 
 var hand_tracking: HandTracking
 var is_enabled: bool = true
+## Let the Python bridge debounce gestures (python/gesture_events.py) and only
+## turn its gesture_progress/gesture_detected events into signals here.
+var use_server_gestures: bool = false
 
 # Current expected gesture (set by panel controller)
-var expected_gesture: Enums.InteractionType = Enums.InteractionType.NONE
+var expected_gesture: Enums.InteractionType = Enums.InteractionType.NONE:
+	set(value):
+		expected_gesture = value
+		_send_gesture_context()
 
 # Gesture timing state
 var _gesture_start_time: float = 0.0
@@ -30,6 +37,7 @@ func _ready() -> void:
 	hand_tracking.landmarks_received.connect(_on_landmarks_received)
 	hand_tracking.tracking_lost.connect(_on_tracking_lost)
 	hand_tracking.connection_status_changed.connect(_on_connection_changed)
+	hand_tracking.event_received.connect(_on_bridge_event)
 
 	# Auto-connect to bridge
 	call_deferred("_auto_connect")
@@ -42,10 +50,35 @@ func _auto_connect() -> void:
 func _on_connection_changed(connected: bool) -> void:
 	if connected:
 		print("GestureDetector: Hand tracking connected")
+		_send_gesture_context()
 	else:
 		print("GestureDetector: Hand tracking disconnected")
 
 
+## Tell the bridge which gesture we are waiting for (server gestures only)
+func _send_gesture_context() -> void:
+	if not use_server_gestures or hand_tracking == null:
+		return
+	hand_tracking.send_message({
+		"type": "gesture_events",
+		"expected": Enums.InteractionType.keys()[expected_gesture],
+	})
+
+
+func _on_bridge_event(event: Dictionary) -> void:
+	if not use_server_gestures or not is_enabled:
+		return
+
+	var gesture_type: Enums.InteractionType = Enums.InteractionType.get(
+		event.get("gesture", "NONE"), Enums.InteractionType.NONE)
+	match event.get("type", ""):
+		"gesture_progress":
+			gesture_progress.emit(gesture_type, event.get("progress", 0.0))
+		"gesture_detected":
+			print("Gesture detected: ", Enums.InteractionType.keys()[gesture_type])
+			gesture_detected.emit(gesture_type)
+
+
 func _on_tracking_lost() -> void:
 	_reset_gesture_state()
 	hands_detected.emit(0)
@@ -66,9 +99,12 @@ func _on_landmarks_received(data: Dictionary) -> void:
 	# Extract landmark data for visualization
 	var left_hand_data: Dictionary = data.get("left_hand", {})
 	var right_hand_data: Dictionary = data.get("right_hand", {})
-	var left_landmarks: Array = left_hand_data.get("landmarks", [])
-	var right_landmarks: Array = right_hand_data.get("landmarks", [])
-	landmarks_updated.emit(left_landmarks, right_landmarks)
+	var left_coords: PackedFloat32Array = left_hand_data.get("coords", PackedFloat32Array())
+	var right_coords: PackedFloat32Array = right_hand_data.get("coords", PackedFloat32Array())
+	landmarks_updated.emit(left_coords, right_coords)
+
+	if use_server_gestures:
+		return  # Hold timing happens on the bridge, see _on_bridge_event
 
 	# Get gesture data from Python bridge
 	var gestures: Dictionary = data.get("gestures", {})
@@ -4,24 +4,59 @@ extends Node
 ## WebSocket client for receiving hand landmark data from Python MediaPipe bridge
 
 signal connection_status_changed(connected: bool)
+## A tracked frame. Each present hand ("left_hand"/"right_hand") carries its
+## landmarks as "coords": a PackedFloat32Array of x, y, z per landmark
+## (NUM_LANDMARKS * 3 values, normalized image coordinates). JSON frames also
+## keep the bridge's "landmarks" list of {"id", "x", "y", "z"} Dictionaries;
+## binary frames are decoded straight into "coords" without building them.
 signal landmarks_received(data: Dictionary)
 signal tracking_lost()
 signal tracking_found()
+## Bridge messages with a "type" this node does not handle itself (e.g. gesture events)
+signal event_received(event: Dictionary)
 
 const DEFAULT_HOST := "127.0.0.1"
 const DEFAULT_PORT := 8765
 const RECONNECT_DELAY := 2.0
 
+# Binary wire format (see python/wire_format.py), negotiated as a subprotocol
+const PROTOCOL_BINARY_F32 := "hand-tracking.f32"
+const PROTOCOL_BINARY_I16 := "hand-tracking.i16"
+const BINARY_VERSION := 1
+const BINARY_HEADER_SIZE := 8
+const BINARY_FLAG_INT16 := 0x01
+const BINARY_FLAG_TWO_OPEN_PALMS := 0x02
+const BINARY_FLAG_PREDICTED := 0x04
+const BINARY_HAND_LEFT := 0x01
+const BINARY_HAND_RIGHT := 0x02
+const BINARY_INT16_SCALE := 16384.0
+const NUM_LANDMARKS := 21
+const GESTURE_NAMES := [
+	"None", "Closed_Fist", "Open_Palm", "Pointing_Up",
+	"Thumb_Down", "Thumb_Up", "Victory", "ILoveYou",
+]
+
 var host: String = DEFAULT_HOST
 var port: int = DEFAULT_PORT
+## Set to PROTOCOL_BINARY_F32/I16 before connecting to opt into the binary format.
+## Leave empty to receive JSON.
+var wire_protocol: String = ""
 
 var is_connected: bool = false
 var is_tracking: bool = false
+## Bridge status from its "status" messages: "warming_up" while the camera and
+## model are still loading, then "ready"
+var bridge_status: String = ""
 
 var _socket: WebSocketPeer
 var _reconnect_timer: Timer
 var _last_data_time: float = 0.0
 var _tracking_timeout: float = 0.5  # Seconds without data before considering tracking lost
+# Set when the bridge announces change-driven mode: tracking then follows its
+# tracking_found/tracking_lost events, and silence only means lost after
+# several missed heartbeats.
+var _event_driven: bool = false
+var _heartbeat_timeout: float = 0.0
 
 
 func _ready() -> void:
@@ -37,6 +72,7 @@ func _process(delta: float) -> void:
 	if _socket.get_ready_state() == WebSocketPeer.STATE_CLOSED:
 		if is_connected:
 			is_connected = false
+			bridge_status = ""
 			connection_status_changed.emit(false)
 			_schedule_reconnect()
 		return
@@ -47,13 +83,17 @@ func _process(delta: float) -> void:
 		WebSocketPeer.STATE_OPEN:
 			if not is_connected:
 				is_connected = true
+				_event_driven = false
 				connection_status_changed.emit(true)
 				print("Hand tracking connected to ws://%s:%d" % [host, port])
 
 			# Process incoming messages
 			while _socket.get_available_packet_count() > 0:
 				var packet := _socket.get_packet()
-				_process_packet(packet)
+				if _socket.was_string_packet():
+					_process_packet(packet)
+				else:
+					_process_binary_packet(packet)
 
 		WebSocketPeer.STATE_CLOSING:
 			pass  # Wait for close
@@ -62,7 +102,8 @@ func _process(delta: float) -> void:
 			pass  # Handled above
 
 	# Check for tracking timeout
-	if is_tracking and Time.get_ticks_msec() / 1000.0 - _last_data_time > _tracking_timeout:
+	var timeout := _heartbeat_timeout if _event_driven else _tracking_timeout
+	if is_tracking and Time.get_ticks_msec() / 1000.0 - _last_data_time > timeout:
 		is_tracking = false
 		tracking_lost.emit()
 
@@ -82,12 +123,18 @@ func disconnect_from_bridge() -> void:
 		_socket.close()
 	is_connected = false
 	is_tracking = false
+	bridge_status = ""
 
 
 func _attempt_connection() -> void:
 	var url := "ws://%s:%d" % [host, port]
 	print("Connecting to hand tracking at %s..." % url)
 
+	if wire_protocol != "":
+		_socket.supported_protocols = PackedStringArray([wire_protocol])
+	else:
+		_socket.supported_protocols = PackedStringArray()
+
 	var error := _socket.connect_to_url(url)
 	if error != OK:
 		push_warning("Failed to initiate WebSocket connection: %s" % error_string(error))
@@ -110,18 +157,136 @@ func _process_packet(packet: PackedByteArray) -> void:
 		return
 
 	var data: Dictionary = json.data
+	if not data.has("type"):
+		for side in ["left_hand", "right_hand"]:
+			var hand: Dictionary = data.get(side, {})
+			if hand.has("landmarks"):
+				hand["coords"] = _coords_from_landmarks(hand["landmarks"])
+	_handle_data(data)
+
+
+func _process_binary_packet(packet: PackedByteArray) -> void:
+	if packet.size() < BINARY_HEADER_SIZE or packet.decode_u8(0) != BINARY_VERSION:
+		push_warning("Unsupported hand tracking binary packet")
+		return
+
+	var flags := packet.decode_u8(1)
+	var hand_mask := packet.decode_u8(3)
+	var quantized := (flags & BINARY_FLAG_INT16) != 0
+	var value_size := 2 if quantized else 4
+	var offset := BINARY_HEADER_SIZE
+
+	var data := {
+		"timestamp": packet.decode_u32(4),
+		"left_hand": {},
+		"right_hand": {},
+		"num_hands": packet.decode_u8(2),
+		"gestures": {"left": "None", "right": "None"},
+		"two_open_palms": (flags & BINARY_FLAG_TWO_OPEN_PALMS) != 0,
+	}
+	if (flags & BINARY_FLAG_PREDICTED) != 0:
+		data["predicted"] = true
+
+	for hand in [[BINARY_HAND_LEFT, "left"], [BINARY_HAND_RIGHT, "right"]]:
+		if (hand_mask & hand[0]) == 0:
+			continue
+		var block_size := NUM_LANDMARKS * 3 * value_size
+		if packet.size() < offset + block_size + 2:
+			push_warning("Truncated hand tracking binary packet")
+			return
+		var block := packet.slice(offset, offset + block_size)
+		# float32 blocks convert in one native call (the wire format is little-endian)
+		var coords: PackedFloat32Array = _decode_int16_block(block) if quantized else block.to_float32_array()
+		offset += block_size
+		data[hand[1] + "_hand"] = {"handedness": hand[1], "coords": coords}
+
+	if packet.size() < offset + 2:
+		push_warning("Truncated hand tracking binary packet")
+		return
+	data["gestures"]["left"] = _gesture_name(packet.decode_u8(offset))
+	data["gestures"]["right"] = _gesture_name(packet.decode_u8(offset + 1))
+
+	_handle_data(data)
+
+
+func _decode_int16_block(block: PackedByteArray) -> PackedFloat32Array:
+	# There is no native int16 view of a PackedByteArray, so this is one
+	# decode per value, but still into a packed array rather than Dictionaries
+	var coords := PackedFloat32Array()
+	coords.resize(block.size() / 2)
+	for i in coords.size():
+		coords[i] = block.decode_s16(2 * i) / BINARY_INT16_SCALE
+	return coords
+
+
+func _coords_from_landmarks(landmarks: Array) -> PackedFloat32Array:
+	var coords := PackedFloat32Array()
+	coords.resize(landmarks.size() * 3)
+	for i in landmarks.size():
+		var landmark: Dictionary = landmarks[i]
+		coords[3 * i] = landmark.get("x", 0.0)
+		coords[3 * i + 1] = landmark.get("y", 0.0)
+		coords[3 * i + 2] = landmark.get("z", 0.0)
+	return coords
+
+
+func _gesture_name(gesture_id: int) -> String:
+	return GESTURE_NAMES[gesture_id] if gesture_id < GESTURE_NAMES.size() else "None"
+
+
+func _handle_data(data: Dictionary) -> void:
 	_last_data_time = Time.get_ticks_msec() / 1000.0
 
-	if not is_tracking:
+	if data.has("type"):
+		_handle_event(data)
+		return
+
+	if not is_tracking and not _event_driven:
 		is_tracking = true
 		tracking_found.emit()
 
 	landmarks_received.emit(data)
 
 
+func _handle_event(event: Dictionary) -> void:
+	match event.get("type", ""):
+		"hello":
+			_event_driven = event.get("change_driven", false)
+			_heartbeat_timeout = 3.0 * event.get("heartbeat_interval", 1.0)
+			_set_tracking(event.get("tracking", false))
+		"tracking_found":
+			_set_tracking(true)
+		"tracking_lost":
+			_set_tracking(false)
+		"heartbeat":
+			pass  # Only refreshes _last_data_time
+		"status":
+			bridge_status = event.get("status", "")
+		_:
+			event_received.emit(event)
+
+
+func _set_tracking(tracking: bool) -> void:
+	if tracking == is_tracking:
+		return
+	is_tracking = tracking
+	if tracking:
+		tracking_found.emit()
+	else:
+		tracking_lost.emit()
+
+
+## Send a JSON control message to the bridge (ignored while disconnected)
+func send_message(message: Dictionary) -> void:
+	if _socket.get_ready_state() == WebSocketPeer.STATE_OPEN:
+		_socket.send_text(JSON.stringify(message))
+
+
 ## Get the current connection status as a string
 func get_status_string() -> String:
 	if is_connected:
+		if bridge_status == "warming_up":
+			return "Connected - Warming up"
 		if is_tracking:
 			return "Connected - Tracking"
 		else: